@@ -12,23 +12,27 @@ import werkzeug.wrappers
 
 from minion.core import Application
 from minion.request import Response
-from minion.routing import Router, WerkzeugMapper
+from minion.routing import PrefixRouter, Router, WerkzeugMapper
+from minion.static import StaticFiles
 from minion.wsgi import create_app
-import examples.static
 
 
-CSS = os.path.join(os.path.dirname(examples.static.__file__), "flaskr.css")
+# Only assets live here, since everything beneath it is served as is.
+static = StaticFiles(
+    directory=os.path.join(os.path.dirname(__file__), "static", "flaskr"),
+)
 loader = jinja2.FileSystemLoader(
     os.path.join(os.path.dirname(__file__), "templates", "flaskr"),
 )
 app = Application(
     jinja=jinja2.Environment(loader=loader),
-    router=Router(mapper=WerkzeugMapper()),
+    router=PrefixRouter(default=Router(mapper=WerkzeugMapper())),
     config = {
         "credentials" : {"user" : "admin", "password" : "default"},
         "database" : {"uri" : "/tmp/flaskr.db"},
     },
 )
+app.router.mount(b"static", static)
 
 
 @app.route("/")
@@ -81,12 +85,6 @@ def logout(request):
     return Response(code=302, headers={"Location" : "/"})
 
 
-@app.route("/static/flaskr.css")
-def style(request):
-    with open(CSS) as css:
-        return Response(css.read())
-
-
 @app.bin.provides("db")
 @app.bin.needs(["config"])
 def connect_db(config):
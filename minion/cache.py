@@ -0,0 +1,275 @@
+"""
+Bounded caches for reusing work across requests.
+
+"""
+
+from collections import Counter, OrderedDict
+from threading import Lock
+from timeit import default_timer
+
+import attr
+
+
+_MISSING = object()
+
+
+class LRUCache(object):
+    """
+    A bounded mapping which evicts its least recently used entries.
+
+    Lookups are counted as :attr:`hits` or :attr:`misses`\ .
+
+    Arguments:
+
+        maxsize (int):
+
+            the maximum number of entries to keep
+
+        maxweight (int):
+
+            if provided, the maximum total weight of the entries to keep (e.g.
+            a budget of bytes). Entries heavier than this on their own are
+            not stored at all.
+
+        weigh (callable):
+
+            a callable returning the weight of each value. The default is
+            :func:`len`\ .
+
+    """
+
+    def __init__(self, maxsize=128, maxweight=None, weigh=len):
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self.weight = 0
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._weigh = weigh
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __setitem__(self, key, value):
+        maxweight = self.maxweight
+        with self._lock:
+            self._discard(key)
+            if maxweight is None:
+                self._entries[key] = value
+            else:
+                weight = self._weigh(value)
+                if weight > maxweight:
+                    return
+                self._entries[key] = value, weight
+                self.weight += weight
+                while self.weight > maxweight:
+                    self._discard(next(iter(self._entries)))
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries[key] = value
+            self.hits += 1
+        if self.maxweight is not None:
+            value, _ = value
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._discard(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.weight = 0
+
+    def _discard(self, key, default=None):
+        value = self._entries.pop(key, _MISSING)
+        if value is _MISSING:
+            return default
+        if self.maxweight is not None:
+            value, weight = value
+            self.weight -= weight
+        return value
+
+
+class ResponseCache(object):
+    """
+    A cache of whole responses, for views whose responses are identical for
+    many requests.
+
+    Responses are cached by the method, path and query string of their
+    requests, along with the values of any request headers named in their
+    ``Vary`` header. Only successful (200) responses with bytes bodies which
+    do not set cookies, and whose ``Cache-Control`` does not mark them
+    ``private``\ , ``no-store`` or ``no-cache``\ , are stored. Requests
+    carrying ``Authorization`` are never served from (or stored in) the
+    cache. A copy of each response is stored, and each request it is served
+    to gets a copy of its own (with its own headers and cookies), so that
+    responses can be modified after being cached.
+
+    Arguments:
+
+        maxsize (int):
+
+            the maximum number of responses to keep
+
+        maxweight (int):
+
+            the maximum total size (in bytes) of the bodies of the responses
+            to keep
+
+        clock (callable):
+
+            a callable returning the current time in seconds, used to expire
+            responses
+
+    """
+
+    def __init__(
+        self, maxsize=1024, maxweight=16 * 1024 * 1024, clock=default_timer,
+    ):
+        self._responses = LRUCache(
+            maxsize=maxsize, maxweight=maxweight, weigh=_weigh_entry,
+        )
+        self._varies = LRUCache(maxsize=maxsize)
+        self._generations = Counter()
+        self._lock = Lock()
+        self._clock = clock
+
+    def get(self, request):
+        """
+        Retrieve the cached response to the given request, if any.
+
+        """
+
+        if "Authorization" in request.headers:
+            return None
+
+        resource = _resource_of(request)
+        varies = self._varies.get(resource)
+        if varies is None:
+            return None
+
+        key = resource, _varied(request=request, varies=varies)
+        entry = self._responses.get(key)
+        if entry is None:
+            return None
+
+        response, expires, generations = entry
+        if expires <= self._clock() or any(
+            self._generations[tag] != generation
+            for tag, generation in generations
+        ):
+            self._responses.pop(key)
+            return None
+        return _copy(response)
+
+    def store(self, request, response, ttl, tags=()):
+        """
+        Cache the given response to the given request, if it's cacheable.
+
+        Arguments:
+
+            ttl (float):
+
+                the number of seconds to serve the response for
+
+            tags (iterable):
+
+                tags which can later be used to :meth:`purge` the response
+
+        """
+
+        content = response.content
+        if (
+            response.code != 200 or
+            not isinstance(content, bytes) or
+            response.cookies or
+            "Authorization" in request.headers or
+            _UNCACHEABLE_DIRECTIVES & _cache_control(response.headers)
+        ):
+            return
+
+        varies = tuple(
+            sorted(
+                set(
+                    name.strip().lower().decode("latin-1")
+                    for value in response.headers.get("Vary", ())
+                    for name in value.split(b",")
+                ),
+            ),
+        )
+        if u"*" in varies:
+            return
+
+        resource = _resource_of(request)
+        generations = self._generations
+        self._varies[resource] = varies
+        self._responses[resource, _varied(request=request, varies=varies)] = (
+            _copy(response),
+            self._clock() + ttl,
+            tuple((tag, generations[tag]) for tag in tags),
+        )
+
+    def purge(self, tag):
+        """
+        Discard all cached responses stored with the given tag.
+
+        """
+
+        with self._lock:
+            self._generations[tag] += 1
+
+    def clear(self):
+        """
+        Discard all cached responses.
+
+        """
+
+        self._responses.clear()
+        self._varies.clear()
+
+
+# Directives of responses which must not be served to other requests as-is.
+_UNCACHEABLE_DIRECTIVES = frozenset([b"private", b"no-store", b"no-cache"])
+
+
+def _cache_control(headers):
+    return set(
+        directive.partition(b"=")[0].strip().lower()
+        for value in headers.get("Cache-Control", ())
+        for directive in value.split(b",")
+    )
+
+
+def _resource_of(request):
+    url = request.url
+    return request.method, url.scheme, url.host, url.port, url.path, url.query
+
+
+def _varied(request, varies):
+    headers = request.headers
+    return tuple(tuple(headers.get(name, ())) for name in varies)
+
+
+def _copy(response):
+    return attr.evolve(
+        response,
+        headers=response.headers.mutable(),
+        cookies=list(response.cookies),
+    )
+
+
+def _weigh_entry(entry):
+    response, _, _ = entry
+    return len(response.content)
@@ -0,0 +1,216 @@
+"""
+Compression of response bodies for clients which accept it.
+
+"""
+
+import hashlib
+import zlib
+
+import attr
+
+from minion.cache import LRUCache
+
+
+_COMPRESSIBLE_CONTENT_TYPES = frozenset(
+    [
+        b"application/javascript",
+        b"application/json",
+        b"application/xml",
+        b"image/svg+xml",
+        b"text/css",
+        b"text/html",
+        b"text/javascript",
+        b"text/plain",
+        b"text/xml",
+    ],
+)
+
+# In order of preference, used to break ties.
+_ENCODINGS = (b"gzip", b"deflate")
+_WBITS = {b"gzip": 16 + zlib.MAX_WBITS, b"deflate": zlib.MAX_WBITS}
+_MISSING = object()
+
+
+@attr.s
+class Compressor(object):
+    """
+    Compresses response bodies with gzip or deflate (see :rfc:`7231#5.3.4`\ ).
+
+    Arguments:
+
+        minimum_size (int):
+
+            the size (in bytes) below which bodies are not worth compressing
+
+        content_types (frozenset):
+
+            the media types whose bodies will be compressed
+
+        level (int):
+
+            the compression level to use
+
+        cache (minion.cache.LRUCache):
+
+            a cache to store compressed bodies in, by their hash, so that
+            identical bodies are compressed only once. If unprovided, one
+            with a budget of 16MiB (of compressed bodies) will be created.
+
+    """
+
+    minimum_size = attr.ib(default=1024)
+    content_types = attr.ib(default=_COMPRESSIBLE_CONTENT_TYPES)
+    level = attr.ib(default=6)
+    cache = attr.ib(
+        default=attr.Factory(
+            lambda: LRUCache(maxsize=256, maxweight=16 * 1024 * 1024),
+        ),
+        repr=False,
+    )
+    _negotiated = attr.ib(
+        default=attr.Factory(lambda: LRUCache(maxsize=128)),
+        init=False,
+        repr=False,
+    )
+
+    def compress(self, request, response):
+        """
+        Compress the given response to the given request, if appropriate.
+
+        Returns:
+
+            Response: the (possibly new) response
+
+        """
+
+        content = response.content
+        if not isinstance(content, bytes):
+            return response
+        head = request.method == b"HEAD" and not content
+        if head:
+            # The body was already stripped (see minion.routing.Router), but
+            # the headers should still be those a GET would have gotten. Its
+            # size may not be known, in which case assume it's big enough.
+            size = _content_length(response.headers)
+        else:
+            size = len(content)
+        if size is not None and size < self.minimum_size:
+            return response
+
+        headers = response.headers
+        if "Content-Encoding" in headers:
+            return response
+        content_type = headers.get("Content-Type")
+        if not content_type:
+            return response
+        media_type = content_type[0].partition(b";")[0].strip().lower()
+        if media_type not in self.content_types:
+            return response
+
+        headers = headers.mutable()
+        _add_vary(headers)
+
+        encoding = self._negotiate(request.headers.get("Accept-Encoding"))
+        if encoding is None:
+            return attr.evolve(response, headers=headers)
+
+        if head:
+            headers["Content-Encoding"] = [encoding]
+            # The compressed length is unknown without the body.
+            headers.pop("Content-Length", None)
+            _weaken_etag(headers)
+            return attr.evolve(response, headers=headers)
+
+        key = hashlib.sha1(content).digest(), encoding
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressor = zlib.compressobj(
+                self.level, zlib.DEFLATED, _WBITS[encoding],
+            )
+            compressed = compressor.compress(content) + compressor.flush()
+            self.cache[key] = compressed
+
+        headers["Content-Encoding"] = [encoding]
+        if "Content-Length" in headers:
+            headers["Content-Length"] = [
+                str(len(compressed)).encode("ascii"),
+            ]
+        _weaken_etag(headers)
+        return attr.evolve(response, content=compressed, headers=headers)
+
+    def _negotiate(self, header):
+        """
+        Choose an encoding for the given Accept-Encoding header values.
+
+        """
+
+        if not header:
+            return None
+        header = b",".join(header)
+
+        encoding = self._negotiated.get(header, _MISSING)
+        if encoding is _MISSING:
+            encoding = self._negotiated[header] = _choose_encoding(header)
+        return encoding
+
+
+def _choose_encoding(header):
+    qualities = _parse_accept_encoding(header)
+    best, best_quality = None, 0
+    for encoding in _ENCODINGS:
+        quality = qualities.get(encoding, qualities.get(b"*", 0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _parse_accept_encoding(header):
+    """
+    Parse an Accept-Encoding header into a mapping from codings to qualities.
+
+    """
+
+    qualities = {}
+    for coding_and_parameters in header.split(b","):
+        coding, _, raw_parameters = coding_and_parameters.partition(b";")
+        quality = 1.0
+        for raw_parameter in raw_parameters.split(b";"):
+            key, _, value = raw_parameter.partition(b"=")
+            if key.strip() == b"q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    return qualities
+
+
+def _content_length(headers):
+    length = headers.get("Content-Length")
+    if not length:
+        return None
+    try:
+        return int(length[0])
+    except ValueError:
+        return None
+
+
+def _weaken_etag(headers):
+    etag = headers.get("ETag")
+    if etag and not etag[0].startswith(b"W/"):
+        # The compressed body is no longer byte-for-byte identical.
+        headers["ETag"] = [b"W/" + etag[0]]
+
+
+def _add_vary(headers):
+    vary = headers.get("Vary")
+    if vary is None:
+        headers["Vary"] = [b"Accept-Encoding"]
+        return
+    existing = set(
+        value.strip().lower()
+        for values in vary
+        for value in values.split(b",")
+    )
+    if not existing & set([b"*", b"accept-encoding"]):
+        vary.append(b"Accept-Encoding")
@@ -43,6 +43,11 @@ class Application(object):
             (One can be added later, or multiple environments used, by calling
             `bind_jinja_environment`.)
 
+        compressor (compression.Compressor):
+
+            if provided, used to compress the bodies of responses for clients
+            which accept compressed ones.
+
     """
 
     config = attr.ib(default=attr.Factory(dict))
@@ -52,6 +57,7 @@ class Application(object):
         default=attr.Factory(lambda: Router(mapper=SimpleMapper())),
     )
     _jinja = attr.ib(default=None)
+    compressor = attr.ib(default=None, repr=False)
 
     def __attrs_post_init__(self):
         if self.bin is None:
@@ -68,8 +74,14 @@ class Application(object):
 
     def serve(self, request, path):
         self.manager.request_started(request)
-        response = self.router.route(request=request, path=path)
-        self.manager.request_served(request, response)
+        try:
+            response = self.router.route(request=request, path=path)
+        except Exception:
+            self.manager.request_failed(request)
+            raise
+        response = self.manager.request_served(request, response)
+        if self.compressor is not None:
+            response = self.compressor.compress(request, response)
         return response
 
     def bound_bin(self, bin):
@@ -0,0 +1,165 @@
+"""
+Parsing of submitted (urlencoded or multipart) forms.
+
+"""
+
+import tempfile
+
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.formparser import FormDataParser
+from werkzeug.http import parse_options_header
+import attr
+
+
+_URLENCODED = u"application/x-www-form-urlencoded"
+
+
+class FormTooLarge(Exception):
+    """
+    A submitted form exceeded a size limit.
+
+    When raised by a view, :class:`minion.routing.Router` responds with a
+    413 (Request Entity Too Large).
+
+    """
+
+
+@attr.s(frozen=True)
+class FormParser(object):
+    """
+    Parses request bodies into forms and uploaded files, incrementally.
+
+    Bodies are read from their streams only as they are parsed, and uploaded
+    files are spooled to temporary files once they grow beyond a threshold,
+    so that neither large bodies nor large uploads are ever held in memory
+    in their entirety.
+
+    Arguments:
+
+        max_size (int):
+
+            if provided, the size (in bytes) of the largest body to parse.
+            Larger ones raise :class:`FormTooLarge`\ .
+
+        max_memory_size (int):
+
+            the size (in bytes) of the largest (non-file) form data to parse,
+            since that is kept in memory. Larger form data raises
+            :class:`FormTooLarge`\ .
+
+        spool_size (int):
+
+            the size (in bytes) beyond which uploaded files are written to
+            temporary files rather than kept in memory
+
+    """
+
+    max_size = attr.ib(default=None)
+    max_memory_size = attr.ib(default=512 * 1024)
+    spool_size = attr.ib(default=512 * 1024)
+
+    def parse(self, content, content_type, content_length=None):
+        """
+        Parse a request body.
+
+        Arguments:
+
+            content:
+
+                a file-like object to read the body from
+
+            content_type (bytes):
+
+                the value of the request's ``Content-Type`` header, if any
+
+            content_length (int):
+
+                the length of the body, if known
+
+        Returns:
+
+            tuple: the form (a
+            :class:`werkzeug.datastructures.MultiDict` of names to values)
+            and the uploaded files (a ``MultiDict`` of names to
+            :class:`werkzeug.datastructures.FileStorage`\ s)
+
+        """
+
+        if not content_type or content_length == 0:
+            return MultiDict(), MultiDict()
+        if isinstance(content_type, bytes):
+            content_type = content_type.decode("latin-1")
+        mimetype, options = parse_options_header(content_type)
+
+        limit = self.max_size
+        if mimetype == _URLENCODED and self.max_memory_size is not None:
+            if limit is None or self.max_memory_size < limit:
+                limit = self.max_memory_size
+        if limit is not None:
+            if content_length is not None and content_length > limit:
+                raise FormTooLarge(content_length)
+            content = _Limited(stream=content, limit=limit)
+
+        parser = FormDataParser(
+            stream_factory=self._spool,
+            max_form_memory_size=self.max_memory_size,
+            max_content_length=self.max_size,
+        )
+        try:
+            _, form, files = parser.parse(
+                content, mimetype, content_length, options,
+            )
+        except RequestEntityTooLarge:
+            raise FormTooLarge(content_length)
+        return form, files
+
+    def _spool(
+        self,
+        total_content_length=None,
+        content_type=None,
+        filename=None,
+        content_length=None,
+    ):
+        return tempfile.SpooledTemporaryFile(
+            max_size=self.spool_size, mode="w+b",
+        )
+
+
+def _parse_content_length(value):
+    """
+    Parse a ``Content-Length`` value, treating malformed ones as no body.
+
+    """
+
+    if value is None:
+        return None
+    try:
+        length = int(value)
+    except ValueError:
+        return 0
+    return length if length >= 0 else 0
+
+
+class _Limited(object):
+    """
+    A stream which refuses to be read beyond a limit, whether or not its
+    length was declared up front.
+
+    """
+
+    def __init__(self, stream, limit):
+        self._stream = stream
+        self._remaining = limit
+
+    def read(self, size=-1):
+        return self._counted(self._stream.read(size))
+
+    def readline(self, size=-1):
+        return self._counted(self._stream.readline(size))
+
+    def _counted(self, chunk):
+        self._remaining -= len(chunk)
+        if self._remaining < 0:
+            raise FormTooLarge()
+        return chunk
@@ -4,11 +4,16 @@ APIs for storing and retrieving HTTP headers and cookies.
 """
 
 from bisect import insort
+import calendar
+import re
 
 from future.utils import iteritems, viewkeys
-from pyrsistent import m
+from pyrsistent import m, pmap
+from werkzeug.http import http_date, parse_date
 import attr
 
+from minion.cache import LRUCache
+
 
 _CANONICAL_HEADER_NAMES = {
     b"content-md5": b"Content-MD5",
@@ -19,7 +24,13 @@ _CANONICAL_HEADER_NAMES = {
     b"www-authenticate": b"WWW-Authenticate",
     b"x-xss-protection": b"X-XSS-Protection",
 }
+_MAX_CANONICAL_HEADER_NAMES = 1024
 DEFAULT_PORTS = {b"http": 80, b"https": 443}
+_MISSING = object()
+# See RFC 6265, section 4.1.1.
+_INVALID_COOKIE_NAME = re.compile(br'[\x00-\x20()<>@,;:\\"/\[\]?={}\x7f-\xff]')
+_INVALID_COOKIE_OCTETS = re.compile(br'[\x00-\x20",;\\\x7f-\xff]')
+_INVALID_COOKIE_ATTRIBUTE = re.compile(br"[\x00-\x1f;\x7f]")
 
 
 class NoSuchHeader(LookupError):
@@ -30,10 +41,32 @@ class NoSuchHeader(LookupError):
 
 
 class Headers(object):
+    """
+    HTTP headers, looked up case-insensitively by name.
+
+    The given ``(name, values)`` pairs are only indexed (by lowercased name)
+    when first needed, so headers which are never read are cheap to create.
+    They may be any iterable, including a one-shot one.
+
+    """
+
+    __slots__ = ("_pairs", "_index", "_hash", "_serialized")
+
     def __init__(self, contents=()):
-        self._contents = dict(
-            (name.lower(), values) for name, values in contents
-        )
+        self._pairs = contents
+        self._index = None
+        self._hash = None
+        self._serialized = None
+
+    @property
+    def _contents(self):
+        index = self._index
+        if index is None:
+            index = self._index = dict(
+                (name.lower(), values) for name, values in self._pairs
+            )
+            self._pairs = None
+        return index
 
     def __contains__(self, name):
         return name.lower() in self._contents
@@ -55,7 +88,7 @@ class Headers(object):
         return not self == other
 
     def __hash__(self):
-        calculated = getattr(self, "_hash", None)
+        calculated = self._hash
         if calculated is None:
             calculated = 0
             for name, values in iteritems(self._contents):
@@ -72,19 +105,49 @@ class Headers(object):
 
     def canonicalized(self):
         for name, values in iteritems(self._contents):
-            canonical_name = _CANONICAL_HEADER_NAMES.get(name)
-            if canonical_name is None:
-                canonical_name = b"-".join(
-                    word.capitalize() for word in name.split(b"-")
-                )
-            yield canonical_name, values
+            yield _canonical_name(name), values
+
+    def serialized(self):
+        """
+        Serialize these headers into ``(name, value)`` pairs ready to emit.
+
+        Since these headers are immutable, they are serialized only once, so
+        sharing them (e.g. between all responses a renderer produces) makes
+        emitting them essentially free.
+
+        Returns:
+
+            list: a new list of the pairs, with canonical names and with any
+            multiple values joined
+
+        """
+
+        serialized = self._serialized
+        if serialized is None:
+            serialized = self._serialized = _serialize(self)
+        return list(serialized)
 
     def get(self, name, default=None):
         return self._contents.get(name.lower(), default)
 
+    def mutable(self):
+        """
+        Return a mutable copy of these headers.
+
+        """
+
+        # Copied now, rather than lazily, so the copy is a snapshot.
+        return MutableHeaders(
+            [
+                (name, list(values))
+                for name, values in iteritems(self._contents)
+            ],
+        )
+
 
 class MutableHeaders(Headers):
 
+    __slots__ = ()
     __hash__ = None
 
     def __setitem__(self, name, values):
@@ -106,58 +169,335 @@ class MutableHeaders(Headers):
         except KeyError:
             raise NoSuchHeader(name)
 
+    def serialized(self):
+        """
+        Serialize these headers into ``(name, value)`` pairs ready to emit.
+
+        """
+
+        return _serialize(self)
+
+
+def _serialize(headers):
+    return [
+        (name, b",".join(values)) for name, values in headers.canonicalized()
+    ]
+
+
+def _canonical_name(name):
+    """
+    Canonicalize a (lowercase) header name, interning the result.
+
+    """
+
+    canonical_name = _CANONICAL_HEADER_NAMES.get(name)
+    if canonical_name is None:
+        canonical_name = b"-".join(
+            word.capitalize() for word in name.split(b"-")
+        )
+        # Only (arbitrarily many) distinct names sent by clients could fill
+        # this, so stop interning rather than growing without bound.
+        if len(_CANONICAL_HEADER_NAMES) < _MAX_CANONICAL_HEADER_NAMES:
+            _CANONICAL_HEADER_NAMES[name] = canonical_name
+    return canonical_name
+
+
+class Cookies(object):
+    """
+    The cookies sent with a request (see :rfc:`6265#section-5.4`\ ).
+
+    The ``Cookie`` header is parsed only when (and the first time) a cookie
+    is read.
+
+    Arguments:
+
+        header (list):
+
+            the values of the request's ``Cookie`` header(s), or ``None``
+
+    Attributes:
+
+        read (set):
+
+            the names of the cookies which have been read (whether or not
+            they were present)
+
+    """
+
+    __slots__ = ("_header", "_parsed", "read")
+
+    def __init__(self, header=None):
+        self._header = header
+        self._parsed = None
+        self.read = set()
+
+    def __contains__(self, name):
+        return self.get(name, _MISSING) is not _MISSING
+
+    def __getitem__(self, name):
+        value = self.get(name, _MISSING)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    def get(self, name, default=None):
+        self.read.add(name)
+        parsed = self._parsed
+        if parsed is None:
+            parsed = self._parsed = _parse_cookies(self._header or ())
+            self._header = None
+        return parsed.get(name, default)
+
+
+def _parse_cookies(header):
+    cookies = {}
+    for value in header:
+        for pair in value.split(b";"):
+            name, equals, value = pair.partition(b"=")
+            if not equals:
+                continue
+            name, value = name.strip(), value.strip()
+            if len(value) > 1 and value[:1] == value[-1:] == b'"':
+                value = value[1:-1]
+            # Earlier cookies are the more specific ones, so they win.
+            cookies.setdefault(name, value)
+    return cookies
+
+
+@attr.s(frozen=True)
+class SetCookie(object):
+    """
+    A cookie to set on a response (see :rfc:`6265#section-4.1`\ ).
+
+    """
+
+    name = attr.ib()
+    value = attr.ib()
+    max_age = attr.ib(default=None)
+    expires = attr.ib(default=None)
+    path = attr.ib(default=None)
+    domain = attr.ib(default=None)
+    secure = attr.ib(default=False)
+    http_only = attr.ib(default=False)
+    same_site = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        if not self.name or _INVALID_COOKIE_NAME.search(self.name):
+            raise ValueError("Invalid cookie name {!r}".format(self.name))
+        if _INVALID_COOKIE_OCTETS.search(self.value) is not None:
+            raise ValueError(
+                "Invalid cookie octets in {!r}".format(self.value),
+            )
+        for each in self.path, self.domain, self.same_site:
+            if each is not None and _INVALID_COOKIE_ATTRIBUTE.search(each):
+                raise ValueError(
+                    "Invalid cookie attribute value {!r}".format(each),
+                )
+
+    def serialize(self):
+        """
+        Serialize this cookie into a ``Set-Cookie`` header value.
+
+        """
+
+        parts = [self.name + b"=" + self.value]
+        if self.max_age is not None:
+            parts.append(b"Max-Age=" + str(int(self.max_age)).encode("ascii"))
+        if self.expires is not None:
+            expires = http_date(self.expires)
+            if not isinstance(expires, bytes):
+                expires = expires.encode("ascii")
+            parts.append(b"Expires=" + expires)
+        if self.path is not None:
+            parts.append(b"Path=" + self.path)
+        if self.domain is not None:
+            parts.append(b"Domain=" + self.domain)
+        if self.secure:
+            parts.append(b"Secure")
+        if self.http_only:
+            parts.append(b"HttpOnly")
+        if self.same_site is not None:
+            parts.append(b"SameSite=" + self.same_site)
+        return b"; ".join(parts)
+
+
+def not_modified(headers, etag=None, last_modified=None):
+    """
+    Check whether a conditional request can be answered with a 304.
+
+    ``If-None-Match`` is compared weakly (see :rfc:`7232#section-3.2`\ ) and,
+    when present, takes precedence over ``If-Modified-Since``\ .
+
+    Arguments:
+
+        headers (Headers):
+
+            the headers of the request
+
+        etag (bytes):
+
+            the (possibly weak) entity tag of the current representation
+
+        last_modified (int):
+
+            the POSIX timestamp the resource was last modified at
+
+    """
+
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        etags = set(
+            _opaque(each.strip())
+            for value in if_none_match
+            for each in value.split(b",")
+        )
+        return b"*" in etags or _opaque(etag) in etags
+
+    if last_modified is not None:
+        if_modified_since = headers.get("If-Modified-Since")
+        if if_modified_since is not None:
+            since = _timestamp_of(if_modified_since[0])
+            return since is not None and last_modified <= since
+    return False
+
+
+def _timestamp_of(value):
+    """
+    Parse an HTTP-date (e.g. a ``Last-Modified`` value) into a POSIX timestamp.
+
+    """
+
+    parsed = parse_date(value.decode("latin-1"))
+    if parsed is None:
+        return None
+    return calendar.timegm(parsed.utctimetuple())
+
+
+def _opaque(etag):
+    if etag.startswith(b"W/"):
+        return etag[2:]
+    return etag
 
-@attr.s
+
+@attr.s(frozen=True)
 class Accept(object):
     """
     A parsed representation of an HTTP Accept header (see :rfc:`7231#5.3.2`\ ).
 
+    Instances are immutable, and may be shared between requests.
+
     """
 
     media_types = attr.ib()
+    _best_matches = attr.ib(
+        default=attr.Factory(dict), init=False, repr=False, cmp=False,
+    )
 
     @classmethod
     def from_header(cls, header):
         """
         Parse out an Accept header.
 
+        Since few distinct headers are seen in practice, the result of
+        parsing each is cached (in a bounded, process-wide cache).
+
         """
 
         if header is None:
             return cls.ALL
 
+        key = cls, header
+        accept = _PARSED_ACCEPT_HEADERS.get(key)
+        if accept is None:
+            accept = _PARSED_ACCEPT_HEADERS[key] = cls._parse(header)
+        return accept
+
+    @classmethod
+    def _parse(cls, header):
         media_types = []
         for range_and_parameters in header.split(b","):
-            raw_range, _, raw_parameters = range_and_parameters.partition(b";")
-
-            quality = 1.0
-            media_parameters = {}
-            if raw_parameters:
-                for raw_parameter in raw_parameters.split(b";"):
-                    key, _, value = raw_parameter.partition(b"=")
-                    key = key.strip()
-                    value = value.strip()
-                    if key == b"q":
-                        quality = float(value)
-                    else:
-                        media_parameters[key] = value
-
-            raw_type, _, raw_subtype = raw_range.partition(b"/")
-
-            type = raw_type.strip()
-            subtype = raw_subtype.strip()
-
-            insort(
-                media_types,
-                MediaRange(
-                    type=type if type != b"*" else STAR,
-                    subtype=subtype if subtype != b"*" else STAR,
-                    quality=quality,
-                    parameters=media_parameters,
-                ),
-            )
+            insort(media_types, _parse_media_range(range_and_parameters))
         return cls(media_types=tuple(media_types))
 
+    def best_match(self, offers):
+        """
+        Find the media type the client most prefers out of the given ones.
+
+        Each offered media type is given the quality of the most specific
+        media range it matches. The results are memoized for each set of
+        offers (and shared along with the instance).
+
+        Arguments:
+
+            offers (tuple):
+
+                the media types (e.g. ``b"application/json"``\ ) that are
+                available, in order of preference, used to break ties
+
+        Returns:
+
+            the best offered media type, or ``None`` if none is acceptable
+
+        """
+
+        best = self._best_matches.get(offers, _MISSING)
+        if best is _MISSING:
+            best = self._best_matches[offers] = self._best_match(offers)
+        return best
+
+    def _best_match(self, offers):
+        best, best_quality = None, 0
+        for offer in offers:
+            offered = _parse_media_range(offer)
+            matching = [
+                media_range for media_range in self.media_types
+                if media_range.matches(offered)
+            ]
+            if not matching:
+                continue
+            quality = max(matching, key=_specificity).quality
+            if quality > best_quality:
+                best, best_quality = offer, quality
+        return best
+
+
+def _parse_media_range(range_and_parameters):
+    raw_range, _, raw_parameters = range_and_parameters.partition(b";")
+
+    quality = 1.0
+    media_parameters = {}
+    if raw_parameters:
+        for raw_parameter in raw_parameters.split(b";"):
+            key, _, value = raw_parameter.partition(b"=")
+            key = key.strip()
+            value = value.strip()
+            if key == b"q":
+                quality = float(value)
+            else:
+                media_parameters[key] = value
+
+    raw_type, _, raw_subtype = raw_range.partition(b"/")
+
+    type = raw_type.strip()
+    subtype = raw_subtype.strip()
+
+    return MediaRange(
+        type=type if type != b"*" else STAR,
+        subtype=subtype if subtype != b"*" else STAR,
+        quality=quality,
+        parameters=media_parameters,
+    )
+
+
+def _specificity(media_range):
+    return (
+        media_range.type is not STAR,
+        media_range.subtype is not STAR,
+        len(media_range.parameters),
+    )
+
 
 class _Star(object):
     """
@@ -175,7 +515,7 @@ class _Star(object):
 STAR = _Star()
 
 
-@attr.s(cmp=False, hash=True)
+@attr.s(cmp=False, hash=True, frozen=True)
 class MediaRange(object):
     """
     A media range.
@@ -187,7 +527,7 @@ class MediaRange(object):
 
     type = attr.ib(default=STAR)
     subtype = attr.ib(default=STAR)
-    parameters = attr.ib(default=m())
+    parameters = attr.ib(default=m(), converter=pmap)
     quality = attr.ib(default=1.0)
 
     def __eq__(self, other):
@@ -217,5 +557,21 @@ class MediaRange(object):
 
         return viewkeys(self.parameters) < viewkeys(other.parameters)
 
+    def matches(self, other):
+        """
+        Check whether the given (concrete) media type is within this range.
+
+        """
+
+        if self.type is not STAR and self.type != other.type:
+            return False
+        if self.subtype is not STAR and self.subtype != other.subtype:
+            return False
+        return all(
+            other.parameters.get(key) == value
+            for key, value in iteritems(self.parameters)
+        )
+
 
 Accept.ALL = Accept(media_types=(MediaRange(),))
+_PARSED_ACCEPT_HEADERS = LRUCache(maxsize=256)
@@ -3,7 +3,7 @@ import json
 
 import attr
 
-from minion.http import Headers, MediaRange
+from minion.http import Headers, MutableHeaders
 from minion.request import Response
 
 
@@ -17,17 +17,70 @@ class JSON(object):
         self._dumps = partial(json.dumps, **kwargs)
 
     def render(self, request, jsonable):
-        machine_json = request.accept.media_types[-1] == MediaRange(
-            type="application", subtype="json",
-        )
-        if machine_json:
+        best = request.accept.best_match(_HUMAN_OR_MACHINE)
+        if best == b"application/json":
             content = self._dumps(jsonable, separators=",:")
         else:
             content = self._dumps(jsonable, indent=2, sort_keys=True)
-        return Response(
-            content=content,
-            headers=Headers([("Content-Type", ["application/json"])]),
-        )
+        return Response(content=content, headers=_JSON_HEADERS)
+
+
+# Clients which accept anything are humans, unless they prefer JSON.
+_HUMAN_OR_MACHINE = (b"text/plain", b"application/json")
+_JSON_HEADERS = Headers([("Content-Type", ["application/json"])])
+
+
+class Negotiated(object):
+    """
+    A renderer which delegates to another, depending on which media type each
+    request accepts best.
+
+    Arguments:
+
+        renderers (list):
+
+            ``(media_type, renderer)`` pairs, in order of preference, used
+            to break ties
+
+    Attributes:
+
+        produces (tuple):
+
+            the media types which can be rendered (which routes using this
+            renderer will be declared to produce)
+
+    """
+
+    def __init__(self, renderers):
+        self._renderers = dict(renderers)
+        self.produces = tuple(media_type for media_type, _ in renderers)
+
+    def _negotiate(self, request):
+        best = request.accept.best_match(self.produces)
+        if best is None:
+            return None
+        return self._renderers[best]
+
+    def render(self, request, returned):
+        renderer = self._negotiate(request)
+        if renderer is None:
+            return Response(code=406)
+        return _varying_on_accept(renderer.render(request, returned))
+
+    def render_head(self, request, returned):
+        renderer = self._negotiate(request)
+        if renderer is None:
+            return Response(code=406)
+        render = getattr(renderer, "render_head", renderer.render)
+        return _varying_on_accept(render(request, returned))
+
+
+def _varying_on_accept(response):
+    headers = response.headers
+    if not isinstance(headers, MutableHeaders):
+        headers = response.headers = headers.mutable()
+    headers.add_value("Vary", b"Accept")
+    return response
 
 
 class SimpleJSON(object):
@@ -62,8 +115,15 @@ def bind(renderer, to):
     """
     Bind a renderer to the given callable by constructing a new rendering view.
 
+    Renderers may additionally define a ``render_head`` method, which will be
+    used instead of ``render`` for ``HEAD`` requests to avoid producing a body
+    which will only be thrown away. Their responses should carry the
+    ``Content-Length`` (and any other headers) the body would have had.
+
     """
 
+    render_head = getattr(renderer, "render_head", renderer.render)
+
     @wraps(to)
     def view(request, **kwargs):
         try:
@@ -75,6 +135,8 @@ def bind(renderer, to):
             return view_error(request, error)
 
         try:
+            if request.method == b"HEAD":
+                return render_head(request, returned)
             return renderer.render(request, returned)
         except Exception as error:
             render_error = getattr(renderer, "render_error", None)
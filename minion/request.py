@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 from io import BytesIO
+import os
 
 from cached_property import cached_property as calculated_once
 from future.utils import iteritems
@@ -7,7 +8,8 @@ from werkzeug.http import HTTP_STATUS_CODES as HTTP_STATUS_PHRASES
 import attr
 
 from minion.deferred import Deferred
-from minion.http import Accept, Headers, MutableHeaders
+from minion.forms import FormParser, _parse_content_length
+from minion.http import Accept, Cookies, Headers, MutableHeaders, SetCookie
 
 
 HTTP_STATUS_CODES = dict(
@@ -25,6 +27,7 @@ class Responder(object):
     def __init__(self, request):
         self._after_deferreds = []
         self.request = request
+        self.response = None
 
     def after(self):
         """
@@ -40,19 +43,79 @@ class Responder(object):
         self._after_deferreds.append(d)
         return d.chain
 
-    def finish(self):
+    def finish(self, response=None):
+        """
+        Report that the response (if given) has been sent.
+
+        """
+
+        if response is not None:
+            self.response = response
         for d in self._after_deferreds:
             d.succeed(self)
 
 
+def response_sent(request, response):
+    """
+    Run any callbacks waiting for the given response to have been sent.
+
+    Servers call this once they have finished sending each response (whether
+    or not it was received).
+
+    """
+
+    responder = getattr(request, "_responder", None)
+    if responder is not None:
+        request._responder = None
+        responder.finish(response=response)
+
+
+def _awaiting_sent(request):
+    """
+    Check whether anything is waiting for the response to a request to be
+    sent, so that servers can avoid tracking when it is otherwise.
+
+    """
+
+    return getattr(request, "_responder", None) is not None
+
+
+class _RequestContext(object):
+    """
+    The state a manager keeps for a request while it is being served.
+
+    It is attached to the request itself, so that it is only ever touched by
+    whatever is serving that request, and so that it goes away with it. A
+    request served by more than one manager (e.g. by an application mounted
+    within another) has one context per manager, chained via ``parent``\ .
+
+    """
+
+    __slots__ = ("manager", "parent", "callbacks")
+
+    def __init__(self, manager, parent):
+        self.manager = manager
+        self.parent = parent
+        self.callbacks = None
+
+
 class Manager(object):
     """
     The request manager coordinates state during each active request.
 
+    Arguments:
+
+        executor:
+
+            if provided, an executor (e.g. a bounded
+            ``concurrent.futures.ThreadPoolExecutor``\ ) to submit callbacks
+            registered with :meth:`after_sent` to, rather than running them
+            on the server's thread once each response is sent
+
     """
 
-    def __init__(self):
-        self._requests = {}
+    def __init__(self, executor=None):
+        self.executor = executor
 
     def after_response(self, request, fn, *args, **kwargs):
         """
@@ -73,19 +136,86 @@ class Manager(object):
                 than ``None``, it will be used as the new response.
         """
 
-        self._requests[id(request)]["callbacks"].append((fn, args, kwargs))
+        context = self._context_of(request)
+        if context.callbacks is None:
+            context.callbacks = []
+        context.callbacks.append((fn, args, kwargs))
+
+    def after_sent(self, request, fn, *args, **kwargs):
+        """
+        Call the given callable after the response to the given request has
+        been sent, so that it does not delay it.
+
+        Unlike with :meth:`after_response`\ , the callable cannot modify the
+        response. It's meant for work the requester needn't wait for (like
+        logging, collecting analytics, or warming caches), and is only run
+        by servers which report having sent responses (see
+        :func:`response_sent`\ ).
+
+        Arguments:
+
+            request:
+
+                the request to piggyback
+
+            fn (callable):
+
+                a callable that takes at least one argument, the response
+                which was sent, along with any additional positional and
+                keyword arguments passed to this function which will be
+                passed along
+        """
+
+        self._context_of(request)
+        responder = getattr(request, "_responder", None)
+        if responder is None:
+            responder = request._responder = Responder(request=request)
+        responder.after().on_success(self._sent, fn, args, kwargs)
 
     def request_started(self, request):
-        self._requests[id(request)] = {"callbacks": [], "assets": {}}
+        request._request_context = _RequestContext(
+            manager=self, parent=getattr(request, "_request_context", None),
+        )
 
     def request_served(self, request, response):
-        request_data = self._requests.pop(id(request))
-        for callback, args, kwargs in request_data["callbacks"]:
-            callback_response = callback(response, *args, **kwargs)
-            if callback_response is not None:
-                response = callback_response
+        callbacks = self._finish(request).callbacks
+        if callbacks is not None:
+            for callback, args, kwargs in callbacks:
+                callback_response = callback(response, *args, **kwargs)
+                if callback_response is not None:
+                    response = callback_response
         return response
 
+    def request_failed(self, request):
+        """
+        Forget about a request which failed to be served, without calling any
+        of its callbacks.
+
+        """
+
+        self._finish(request)
+
+    def _sent(self, responder, fn, args, kwargs):
+        if self.executor is None:
+            fn(responder.response, *args, **kwargs)
+        else:
+            self.executor.submit(fn, responder.response, *args, **kwargs)
+
+    def _context_of(self, request):
+        context = getattr(request, "_request_context", None)
+        while context is not None and context.manager is not self:
+            context = context.parent
+        if context is None:
+            raise LookupError("{!r} has not been started".format(request))
+        return context
+
+    def _finish(self, request):
+        context = self._context_of(request)
+        # Contexts are started and finished in nested order, so this is the
+        # innermost one.
+        request._request_context = context.parent
+        return context
+
 
 @attr.s
 class Request(object):
@@ -95,6 +225,7 @@ class Request(object):
     headers = attr.ib(default=attr.Factory(Headers))
     method = attr.ib(default=b"GET")
     messages = attr.ib(default=attr.Factory(list), cmp=False)
+    form_parser = attr.ib(default=FormParser(), cmp=False, repr=False)
 
     @calculated_once
     def accept(self):
@@ -103,21 +234,130 @@ class Request(object):
             header = ",".join(header)
         return Accept.from_header(header=header)
 
+    @calculated_once
+    def cookies(self):
+        return Cookies(header=self.headers.get("Cookie"))
+
+    @property
+    def form(self):
+        form, _ = self._parsed_form
+        return form
+
+    @property
+    def files(self):
+        _, files = self._parsed_form
+        return files
+
+    @calculated_once
+    def _parsed_form(self):
+        content_type = self.headers.get("Content-Type")
+        content_length = self.headers.get("Content-Length")
+        return self.form_parser.parse(
+            content=self.content,
+            content_type=None if content_type is None else content_type[0],
+            content_length=_parse_content_length(
+                None if content_length is None else content_length[0],
+            ),
+        )
+
     def flash(self, message):
         self.messages.append(_Message(content=message))
 
 
 @attr.s
 class Response(object):
+    """
+    An HTTP response.
+
+    Its content may be bytes, or an iterable of chunks of bytes which will be
+    streamed (and closed afterwards, if it has a ``close`` method).
+
+    """
 
     content = attr.ib(default="")
     code = attr.ib(default=200)
     headers = attr.ib(default=attr.Factory(MutableHeaders))
+    cookies = attr.ib(default=attr.Factory(list))
 
     @property
     def status(self):
         return HTTP_STATUS_CODES[self.code]
 
+    @property
+    def content_length(self):
+        """
+        The length of this response's content, if it is known up front.
+
+        """
+
+        if isinstance(self.content, bytes):
+            return len(self.content)
+        return None
+
+    def set_cookie(self, name, value, **kwargs):
+        """
+        Set a cookie, which will be serialized when the response is sent.
+
+        Arguments:
+
+            name (bytes):
+
+                the name of the cookie
+
+            value (bytes):
+
+                its value
+
+            kwargs:
+
+                the cookie's attributes (see :class:`minion.http.SetCookie`)
+
+        """
+
+        self.cookies.append(SetCookie(name=name, value=value, **kwargs))
+
+    def serialized_headers(self):
+        """
+        Serialize this response's headers (and cookies), ready to be emitted.
+
+        Returns:
+
+            list: ``(name, value)`` pairs
+
+        """
+
+        serialized = self.headers.serialized()
+        serialized.extend(
+            (b"Set-Cookie", cookie.serialize()) for cookie in self.cookies
+        )
+        return serialized
+
+
+@attr.s
+class FileResponse(Response):
+    """
+    A response whose content is (the rest of) an open file.
+
+    Adapters send the file without reading it into memory where the server
+    supports doing so (e.g. via ``sendfile``\ ), set its ``Content-Length``
+    automatically, and close it afterwards.
+
+    Arguments:
+
+        content:
+
+            a file opened in binary mode
+
+    """
+
+    @property
+    def content_length(self):
+        try:
+            fileno = self.content.fileno()
+        except (AttributeError, IOError, ValueError):
+            return None
+        return os.fstat(fileno).st_size - self.content.tell()
+
 
 @attr.s
 class _Message(object):
@@ -14,23 +14,290 @@ perform these operations in various ways.
 
 """
 
-from collections import defaultdict
-from functools import partial
+from collections import Counter, defaultdict
+from functools import partial, wraps
+from threading import Lock
+from timeit import default_timer
+import hashlib
 
-from future.utils import listitems as items
-from future.moves.urllib.parse import urlencode
+from future.utils import listitems as items, text_type
+from future.moves.urllib.parse import quote, urlencode
 import attr
 
+from minion.cache import LRUCache
+from minion.forms import FormTooLarge
+from minion.http import (
+    DEFAULT_PORTS, MutableHeaders, _timestamp_of, not_modified,
+)
 from minion.renderers import bind
 from minion.request import Response, redirect
 from minion.traversal import traverse
 
 
+_MISSING = object()
+_CONDITIONAL_METHODS = frozenset([b"GET", b"HEAD"])
+# The headers a 304 carries over from the response it replaces (see
+# RFC 7232, section 4.1).
+_NOT_MODIFIED_HEADERS = (
+    "Cache-Control", "Content-Location", "Date", "ETag", "Expires", "Vary",
+)
+
+
+class AlreadyFrozen(Exception):
+    """
+    A route was added to a router or mapper which has already been frozen.
+
+    """
+
+
+class _MethodOverride(object):
+    """
+    A proxy for a request which pretends it was made with a different method.
+
+    """
+
+    __slots__ = ("_request", "method")
+
+    def __init__(self, request, method):
+        self._request = request
+        self.method = method
+
+    def __getattr__(self, name):
+        return getattr(self._request, name)
+
+
+@attr.s(frozen=True)
+class _Redirect(object):
+    """
+    A view which redirects to a URL a mapper has already worked out.
+
+    Routers never cache these, since the URL is often an absolute one built
+    from the host the request was made to.
+
+    """
+
+    to = attr.ib()
+    code = attr.ib()
+
+    def __call__(self, request):
+        return redirect(to=self.to, code=self.code)
+
+
+def _producing(view, media_types):
+    """
+    Respond with a 406 to requests not accepting any of the given types.
+
+    """
+
+    @wraps(view)
+    def producing(request, **kwargs):
+        if request.accept.best_match(media_types) is None:
+            return Response(code=406)
+        return view(request, **kwargs)
+    return producing
+
+
+def _validated(view, validator):
+    """
+    Respond with a 304 to requests which are fresh according to a validator,
+    without calling the view at all.
+
+    """
+
+    @wraps(view)
+    def validated(request, **kwargs):
+        version = validator(request, **kwargs)
+        if version is None:
+            return view(request, **kwargs)
+
+        etag = b'W/"' + version + b'"'
+        if request.method in _CONDITIONAL_METHODS and not_modified(
+            request.headers, etag=etag,
+        ):
+            return Response(
+                content=b"",
+                code=304,
+                headers=MutableHeaders([("ETag", [etag])]),
+            )
+
+        response = view(request, **kwargs)
+        if "ETag" not in response.headers:
+            headers = response.headers.mutable()
+            headers["ETag"] = [etag]
+            response = attr.evolve(response, headers=headers)
+        return response
+    return validated
+
+
+def _cached(view, cache, ttl, tags):
+    """
+    Serve responses to ``GET`` and ``HEAD`` requests from a response cache.
+
+    """
+
+    @wraps(view)
+    def cached(request, **kwargs):
+        if request.method not in _CONDITIONAL_METHODS:
+            return view(request, **kwargs)
+        response = cache.get(request)
+        if response is None:
+            response = view(request, **kwargs)
+            cache.store(request, response, ttl=ttl, tags=tags)
+        return response
+    return cached
+
+
+def _conditional(request, response):
+    """
+    Replace a response with a 304 if the requester already has it.
+
+    Responses with bytes bodies but without an ``ETag`` are given a weak one.
+    Empty responses to ``HEAD`` requests are not, since they weren't rendered
+    with the body a ``GET`` request would get (see ``render_head`` in
+    :func:`minion.renderers.bind`\ ).
+
+    """
+
+    if response.code != 200:
+        return response
+
+    headers = response.headers
+    etag = headers.get("ETag")
+    if etag is not None:
+        etag = etag[0]
+    elif isinstance(response.content, bytes) and (
+        response.content or request.method != b"HEAD"
+    ):
+        etag = b'W/"' + hashlib.sha1(response.content).hexdigest().encode(
+            "ascii",
+        ) + b'"'
+        headers = headers.mutable()
+        headers["ETag"] = [etag]
+        response = attr.evolve(response, headers=headers)
+
+    last_modified = headers.get("Last-Modified")
+    if last_modified is not None:
+        last_modified = _timestamp_of(last_modified[0])
+
+    if not not_modified(
+        request.headers, etag=etag, last_modified=last_modified,
+    ):
+        return response
+
+    close = getattr(response.content, "close", None)
+    if close is not None:
+        close()
+    return Response(
+        content=b"",
+        code=304,
+        headers=MutableHeaders(
+            (name, headers[name])
+            for name in _NOT_MODIFIED_HEADERS if name in headers
+        ),
+        cookies=response.cookies,
+    )
+
+
+def _without_body(response):
+    """
+    Strip the body from a response to a ``HEAD`` request.
+
+    The ``Content-Length`` the body would have had is kept if it's known.
+
+    """
+
+    content = response.content
+    if not content:
+        return response
+
+    headers = response.headers
+    length = response.content_length
+    if length is not None and "Content-Length" not in headers:
+        headers = headers.mutable()
+        headers["Content-Length"] = [str(length).encode("ascii")]
+
+    close = getattr(content, "close", None)
+    if close is not None:
+        close()
+    return Response(
+        content=b"",
+        code=response.code,
+        headers=headers,
+        cookies=response.cookies,
+    )
+
+
 @attr.s
 class Router(object):
+    """
+    A router which routes requests by delegating to a mapper.
+
+    Arguments:
+
+        mapper:
+
+            an object satisfying the mapper interface, which routes will be
+            added to and mapped by
+
+        default_renderer:
+
+            a renderer to bind views to when adding routes which do not
+            specify one
+
+        route_cache (minion.cache.LRUCache):
+
+            if provided, a cache used to store (and reuse) the views mappers
+            resolve for each method and path, including paths which do not
+            resolve to any view at all. It is cleared whenever a route is
+            added. For mappers whose results also depend on the host of
+            each request (those with a true ``varies_by_host`` attribute),
+            views are cached per scheme, host and port too. Redirects are
+            never cached.
+
+        implicit_methods (bool):
+
+            whether to answer ``HEAD`` requests for paths with only a ``GET``
+            route using that route, to strip the bodies of all responses to
+            ``HEAD`` requests, and to answer ``OPTIONS`` requests for paths
+            without an ``OPTIONS`` route with an ``Allow`` header listing the
+            methods routes have been added for (which is cached per path,
+            until a route is added). The default is ``True``.
+
+        conditional (bool):
+
+            whether to answer ``GET`` and ``HEAD`` requests whose
+            ``If-None-Match`` or ``If-Modified-Since`` headers show the
+            requester already has the response with a 304 (and an empty
+            body). Responses with bytes bodies are given weak ``ETag``\ s
+            (hashes of their bodies) if they have none, other than responses
+            to ``HEAD`` requests rendered without a body. The default is
+            ``False``.
+
+            The view is still called (and its response rendered) to find
+            out whether it changed. Views which can tell more cheaply
+            should have a validator (see :meth:`add`\ ) instead, which
+            works whether or not this is set.
+
+        response_cache (minion.cache.ResponseCache):
+
+            if provided, a cache which routes added with a ``cache_ttl``
+            store their responses in
+
+    """
 
     mapper = attr.ib()
     default_renderer = attr.ib(default=None)
+    route_cache = attr.ib(default=None, repr=False)
+    implicit_methods = attr.ib(default=True)
+    conditional = attr.ib(default=False)
+    response_cache = attr.ib(default=None, repr=False)
+    _frozen = attr.ib(default=False, init=False, repr=False)
+    _methods = attr.ib(default=attr.Factory(set), init=False, repr=False)
+    _allowed = attr.ib(
+        default=attr.Factory(lambda: LRUCache(maxsize=1024)),
+        init=False,
+        repr=False,
+    )
 
     def add(
         self,
@@ -39,24 +306,417 @@ class Router(object):
         renderer=False,
         route_name=None,
         methods=(b"GET", b"HEAD"),
+        produces=None,
+        validator=None,
+        cache_ttl=None,
+        cache_tags=(),
         **kw
     ):
+        """
+        Add a route to the mapper.
+
+        Arguments other than those below are as for the mapper.
+
+        Arguments:
+
+            validator:
+
+                if provided, a callable taking the same arguments as the
+                view, and returning a (bytes) version of the resource it
+                serves, or ``None`` if the version is unknown. Requests
+                already having the current version are answered with a 304
+                without calling the view, and other responses are sent with
+                the version as their (weak) ``ETag``\ .
+
+            cache_ttl (float):
+
+                if provided, the number of seconds to serve the view's
+                (cacheable) responses from the router's response cache for,
+                rather than calling it again
+
+            cache_tags (iterable):
+
+                tags to store the view's responses in the response cache
+                with, so that they can be purged together (see
+                :meth:`minion.cache.ResponseCache.purge`\ )
+
+        """
+
+        if self._frozen:
+            raise AlreadyFrozen(route)
         if renderer is False:
             renderer = self.default_renderer
         if renderer is not None:
             fn = bind(renderer=renderer, to=fn)
+            if produces is None:
+                produces = getattr(renderer, "produces", None)
+        if cache_ttl is not None:
+            if self.response_cache is None:
+                raise ValueError(
+                    "Cannot cache {!r} without a response cache".format(route),
+                )
+            fn = _cached(
+                view=fn,
+                cache=self.response_cache,
+                ttl=cache_ttl,
+                tags=tuple(cache_tags),
+            )
+        if validator is not None:
+            fn = _validated(view=fn, validator=validator)
+        if produces is not None:
+            fn = _producing(view=fn, media_types=tuple(produces))
         self.mapper.add(
             route, fn, route_name=route_name, methods=methods, **kw
         )
+        self._methods.update(methods)
+        self._allowed.clear()
+        if self.route_cache is not None:
+            self.route_cache.clear()
 
     def route(self, request, path):
-        render = self.mapper.map(request=request, path=path)
+        route_cache = self.route_cache
+        if route_cache is None:
+            render = self._map(request=request, path=path)
+        else:
+            key = self._key(request=request, path=path)
+            render = route_cache.get(key, _MISSING)
+            if render is _MISSING:
+                render = self._map(request=request, path=path)
+                if not isinstance(render, _Redirect):
+                    route_cache[key] = render
+
         if render is not None:
-            response = render(request=request)
+            try:
+                response = render(request=request)
+            except FormTooLarge:
+                response = Response(code=413)
+        elif self.implicit_methods and request.method == b"OPTIONS":
+            response = self._options(request=request, path=path)
         else:
             response = Response(code=404)
+
+        if self.conditional and request.method in _CONDITIONAL_METHODS:
+            response = _conditional(request=request, response=response)
+        if self.implicit_methods and request.method == b"HEAD":
+            response = _without_body(response)
         return response
 
+    def _key(self, request, path):
+        """
+        The key to cache what the mapper maps a request to under.
+
+        """
+
+        key = request.method, path
+        if getattr(self.mapper, "varies_by_host", False):
+            url = request.url
+            key += (url.scheme, url.host, url.port)
+        return key
+
+    def _map(self, request, path):
+        render = self.mapper.map(request=request, path=path)
+        if render is None and self.implicit_methods:
+            if request.method == b"HEAD":
+                render = self.mapper.map(
+                    request=_MethodOverride(request=request, method=b"GET"),
+                    path=path,
+                )
+        return render
+
+    def _options(self, request, path):
+        key = self._key(request=request, path=path)
+        allowed = self._allowed.get(key)
+        if allowed is None:
+            # Probing shouldn't skew mappers' statistics, where they keep any.
+            probe = getattr(self.mapper, "probe", self.mapper.map)
+            methods = set(
+                method for method in self._methods
+                if method != b"OPTIONS" and probe(
+                    request=_MethodOverride(request=request, method=method),
+                    path=path,
+                ) is not None
+            )
+            if methods:
+                methods.add(b"OPTIONS")
+                if b"GET" in methods:
+                    methods.add(b"HEAD")
+            allowed = self._allowed[key] = b", ".join(sorted(methods))
+
+        if not allowed:
+            return Response(code=404)
+        return Response(
+            content=b"", headers=MutableHeaders([("Allow", [allowed])]),
+        )
+
+    def freeze(self):
+        """
+        Freeze the route table, disallowing any further routes being added.
+
+        Mappers which support it are replaced with an immutable (and faster)
+        version of themselves, which can then be shared between threads.
+
+        """
+
+        freeze = getattr(self.mapper, "freeze", None)
+        if freeze is not None:
+            self.mapper = freeze()
+        self._frozen = True
+
+    def lookup(self, route_name, **kwargs):
+        """
+        Build a URL for the given route name via the mapper.
+
+        """
+
+        return self.mapper.lookup(route_name, **kwargs)
+
+    def lookup_many(self, lookups):
+        """
+        Build URLs for each of the given route names via the mapper.
+
+        Arguments:
+
+            lookups:
+
+                an iterable of ``(route_name, kwargs)`` pairs
+
+        Returns:
+
+            list: the built URLs, in the same order as the given lookups
+
+        """
+
+        lookup = self.mapper.lookup
+        return [lookup(route_name, **kwargs) for route_name, kwargs in lookups]
+
+
+@attr.s
+class PrefixRouter(object):
+    """
+    A router which dispatches on the first segment of each path, and
+    optionally on the host of each request, to other routers or applications
+    mounted there.
+
+    Mounted routers and applications are routed to with the mounted prefix
+    stripped from the path, so each can be routed independently of the number
+    of routes the others have.
+
+    Arguments:
+
+        default:
+
+            a router (or application) which routes requests for paths which
+            are not mounted, and which has any routes added to this router
+            added to it. If unprovided, those requests will receive 404s.
+
+    """
+
+    default = attr.ib(default=None)
+    _mounts = attr.ib(default=attr.Factory(dict), repr=False)
+    _namespaces = attr.ib(default=attr.Factory(dict), repr=False)
+    _hosts = attr.ib(default=False, init=False, repr=False)
+
+    def mount(self, prefix, child, host=None, namespace=None):
+        """
+        Mount a router or application beneath the given path segment.
+
+        Arguments:
+
+            prefix (bytes):
+
+                the (single) path segment to mount beneath
+
+            child:
+
+                an object satisfying the router interface, or an application
+
+            host (str):
+
+                if provided, only requests for the given host are routed to
+                the child. Otherwise, it is routed to for requests to any
+                host that has nothing mounted at the given prefix.
+
+            namespace (str):
+
+                a namespace for looking up the child's route names, which can
+                then be done via ``'<namespace>:<route_name>'``\ .
+
+                The default is the prefix itself.
+
+        """
+
+        prefix = prefix.strip(b"/")
+        if b"/" in prefix:
+            raise ValueError(
+                "Can only mount at single segments, not {!r}".format(prefix),
+            )
+
+        if namespace is None:
+            namespace = prefix.decode("ascii")
+        self._mounts[host, prefix] = _route_via(child)
+        self._namespaces[namespace] = b"/" + prefix, _router_of(child)
+        self._hosts = self._hosts or host is not None
+
+    def add(self, *args, **kwargs):
+        if self.default is None:
+            raise ValueError("no default router to add routes to")
+        self.default.add(*args, **kwargs)
+
+    def route(self, request, path):
+        segment, _, rest = path.lstrip(b"/").partition(b"/")
+
+        route = None
+        if self._hosts:
+            route = self._mounts.get((request.url.host, segment))
+        if route is None:
+            route = self._mounts.get((None, segment))
+
+        if route is not None:
+            return route(request=request, path=b"/" + rest)
+        elif self.default is not None:
+            return _route_via(self.default)(request=request, path=path)
+        return Response(code=404)
+
+    def lookup(self, route_name, **kwargs):
+        colon = u":" if isinstance(route_name, text_type) else b":"
+        namespace, colon, name = route_name.partition(colon)
+        if colon:
+            mounted = self._namespaces.get(namespace)
+            if mounted is not None:
+                prefix, router = mounted
+                url = router.lookup(name, **kwargs)
+                # Unknown names come back as they are rather than as URLs.
+                if not isinstance(url, bytes) or not url.startswith(b"/"):
+                    return route_name
+                return prefix + url
+        if self.default is None:
+            return route_name
+        return _router_of(self.default).lookup(route_name, **kwargs)
+
+    def lookup_many(self, lookups):
+        lookup = self.lookup
+        return [lookup(route_name, **kwargs) for route_name, kwargs in lookups]
+
+
+def _route_via(child):
+    """
+    Return a callable which routes requests to a router or application.
+
+    Applications are served to, so that they manage their own requests.
+
+    """
+
+    return getattr(child, "serve", None) or child.route
+
+
+def _router_of(child):
+    """
+    Return the router of an application, or a router itself.
+
+    """
+
+    return getattr(child, "router", child)
+
+
+class RouteStatistics(object):
+    """
+    Counts of the routes a mapper matched requests to, and of the time it
+    spent matching them.
+
+    Attributes:
+
+        hits (collections.Counter):
+
+            the number of requests matched to each route, by route template
+
+        misses (int):
+
+            the number of requests which did not match any route
+
+        match_time (float):
+
+            the total number of seconds spent matching requests
+
+    """
+
+    def __init__(self):
+        self.hits = Counter()
+        self.misses = 0
+        self.match_time = 0.0
+        self._lock = Lock()
+
+    def record(self, route, elapsed):
+        """
+        Record a request being matched.
+
+        Arguments:
+
+            route:
+
+                the template of the route which was matched, or ``None`` if
+                the request matched no route
+
+            elapsed (float):
+
+                the number of seconds matching took
+
+        """
+
+        with self._lock:
+            if route is None:
+                self.misses += 1
+            else:
+                self.hits[route] += 1
+            self.match_time += elapsed
+
+
+def _by_frequency(rules, template, hits):
+    """
+    Reorder rules which are tried in order so that more frequently hit ones
+    are tried first.
+
+    Rules are only moved ahead of rules whose static prefixes diverge from
+    their own, since no path can match both of them, so the relative order
+    of any two rules which might match the same path is preserved.
+
+    Arguments:
+
+        rules (list):
+
+            the rules, in the order they are currently tried
+
+        template (callable):
+
+            a callable returning the route template of each rule
+
+        hits (collections.Counter):
+
+            the number of hits for each route template
+
+    """
+
+    ordered = []
+    for rule in rules:
+        route = template(rule)
+        count, prefix = hits[route], _static_prefix(route)
+        position = len(ordered)
+        while position:
+            other = template(ordered[position - 1])
+            if hits[other] >= count or _overlap(prefix, _static_prefix(other)):
+                break
+            position -= 1
+        ordered.insert(position, rule)
+    return ordered
+
+
+def _static_prefix(route):
+    # Trailing slashes are ignored, since mappers often redirect to add them.
+    return route.partition("<")[0].partition("{")[0].rstrip("/")
+
+
+def _overlap(prefix, other):
+    return prefix.startswith(other) or other.startswith(prefix)
+
 
 try:
     import routes
@@ -67,34 +727,120 @@ else:
         """
         A mapper that maps via `routes <http://routes.readthedocs.org/>`_.
 
+        Arguments:
+
+            mapper (routes.Mapper):
+
+                a mapper to connect routes to. If unprovided, a new one will
+                be used.
+
+            path_only (bool):
+
+                whether to match only the path being routed rather than the
+                full URL of each request, skipping rendering it to text.
+
+                Results are then cached by method and path.
+
+            match_cache (minion.cache.LRUCache):
+
+                a cache to store match results in when matching only paths.
+                If unprovided, one will be created.
+
+            statistics (RouteStatistics):
+
+                if provided, used to record which routes requests match, by
+                route path
+
         """
 
-        def __init__(self, mapper=None):
+        def __init__(
+            self,
+            mapper=None,
+            path_only=False,
+            match_cache=None,
+            statistics=None,
+        ):
             if mapper is None:
                 mapper = routes.Mapper()
+            if path_only and match_cache is None:
+                match_cache = LRUCache(maxsize=1024)
+            self.statistics = statistics
             self._generator = routes.URLGenerator(mapper, {})  # XXX: environ
             self._mapper = mapper
+            self._matches = match_cache
+            self._path_only = path_only
+            self.varies_by_host = not path_only
+            self._static_urls = {}
 
         def add(self, route, fn, route_name=None, methods=None, **kwargs):
             if methods is not None:
                 kwargs.setdefault("conditions", {})["method"] = methods
             self._mapper.connect(route_name, route, minion_target=fn, **kwargs)
+            if route_name is not None and not kwargs.get("_static"):
+                connected = self._mapper.matchlist[-1]
+                if all(
+                    not isinstance(part, dict) for part in connected.routelist
+                ):
+                    self._static_urls[route_name] = connected.routepath
+                else:
+                    self._static_urls.pop(route_name, None)
+            if self._matches is not None:
+                self._matches.clear()
 
         def map(self, request, path):
-            match = self._mapper.match(
-                request.url.to_text(),
-                # Yes seriously. This seems to be the only way to do this.
-                environ={"REQUEST_METHOD": request.method},
-            )
-            if match is None:
-                return None
+            statistics = self.statistics
+            if statistics is None:
+                return self._map(request=request, path=path)[0]
+
+            start = default_timer()
+            render, route = self._map(request=request, path=path)
+            statistics.record(route, default_timer() - start)
+            return render
+
+        def probe(self, request, path):
+            """
+            Map a request as :meth:`map` would, without recording it in the
+            mapper's statistics.
+
+            """
+
+            return self._map(request=request, path=path)[0]
+
+        def _map(self, request, path):
+            if self._path_only:
+                key = request.method, path
+                matched = self._matches.get(key, _MISSING)
+                if matched is _MISSING:
+                    matched = self._match(url=path, method=request.method)
+                    self._matches[key] = matched
+            else:
+                matched = self._match(
+                    url=request.url.to_text(), method=request.method,
+                )
 
-            render = match.pop("minion_target")
+            if matched is None:
+                return None, None
+            render, match, route = matched
             if match:
                 render = partial(render, **match)
-            return render
+            return render, route
+
+        def _match(self, url, method):
+            matched = self._mapper.routematch(
+                url,
+                # Yes seriously. This seems to be the only way to do this.
+                environ={"REQUEST_METHOD": method},
+            )
+            if matched is None:
+                return None
+            match, route = matched
+            return match.pop("minion_target"), match, route.routepath
 
         def lookup(self, route_name, **kwargs):
+            if not kwargs:
+                url = self._static_urls.get(route_name)
+                if url is not None:
+                    return url
             return self._generator(route_name, **kwargs)
 
 
@@ -107,14 +853,87 @@ else:
         """
         A mapper that uses Werkzeug's routing.
 
+        Arguments:
+
+            map (werkzeug.routing.Map):
+
+                a map to add rules to. If unprovided, a new one will be used.
+
+            server_name (str):
+
+                the server name rules are relative to, when using subdomain
+                rules (in which case the subdomain of each request is
+                determined from its host). Ignored for maps using host
+                matching, whose rules match the host of each request.
+
+            adapter_cache (minion.cache.LRUCache):
+
+                a cache to store the map adapters bound for each host and
+                scheme requests are made to. If unprovided, one will be
+                created.
+
+            statistics (RouteStatistics):
+
+                if provided, used to record which rules requests match, by
+                rule string
+
+            reorder_every (int):
+
+                if provided, rules will be reordered (see :meth:`reorder`)
+                each time this many requests have been mapped
+
         """
 
-        def __init__(self, map=None):
+        # Rules may match (and redirects are built for) the requested host.
+        varies_by_host = True
+
+        def __init__(
+            self,
+            map=None,
+            server_name=None,
+            adapter_cache=None,
+            statistics=None,
+            reorder_every=None,
+        ):
             if map is None:
                 map = werkzeug.routing.Map()
+            if adapter_cache is None:
+                adapter_cache = LRUCache(maxsize=64)
+            if reorder_every is not None and statistics is None:
+                statistics = RouteStatistics()
+            self.statistics = statistics
+            self._reorder_every = self._until_reorder = reorder_every
             self._endpoints = {}
             self._map = map
-            self._adapter = self._map.bind(b"")  # XXX: server_name
+            self._server_name = server_name
+            self._adapter = self._map.bind(server_name or b"")
+            self._adapters = adapter_cache
+            self._builders = {}
+
+        def _bind(self, url):
+            """
+            Bind a new adapter for requests to the given URL's host.
+
+            """
+
+            scheme = url.scheme or u"http"
+            host = url.host
+            if url.port and url.port != DEFAULT_PORTS.get(
+                scheme.encode("ascii"),
+            ):
+                host += u":{}".format(url.port)
+
+            server_name = self._server_name
+            if server_name is None or self._map.host_matching:
+                return self._map.bind(host, url_scheme=scheme)
+
+            subdomain = None
+            suffix = u"." + server_name
+            if url.host.endswith(suffix):
+                subdomain = url.host[:-len(suffix)]
+            return self._map.bind(
+                server_name, subdomain=subdomain, url_scheme=scheme,
+            )
 
         def add(self, route, fn, route_name=None, methods=None, **kwargs):
             if methods is not None:
@@ -123,26 +942,124 @@ else:
             self._endpoints[endpoint] = fn
             rule = werkzeug.routing.Rule(route, endpoint=endpoint, **kwargs)
             self._map.add(rule)
+            rules = self._builders.setdefault(endpoint, [])
+            rules.append(rule)
+            rules.sort(key=lambda rule: rule.build_compare_key())
 
         def map(self, request, path):
+            statistics = self.statistics
+            if statistics is None:
+                return self._match(request=request, path=path)[0]
+
+            start = default_timer()
+            render, rule = self._match(request=request, path=path)
+            statistics.record(rule, default_timer() - start)
+
+            if self._reorder_every is not None:
+                self._until_reorder -= 1
+                if self._until_reorder <= 0:
+                    self._until_reorder = self._reorder_every
+                    self.reorder()
+            return render
+
+        def probe(self, request, path):
+            """
+            Map a request as :meth:`map` would, without recording it in the
+            mapper's statistics or counting it towards reordering.
+
+            """
+
+            return self._match(request=request, path=path)[0]
+
+        def _match(self, request, path):
+            url = request.url
+            key = url.scheme, url.host, url.port
+            adapter = self._adapters.get(key)
+            if adapter is None:
+                adapter = self._adapters[key] = self._bind(url)
+
             try:
-                render, kwargs = self._adapter.match(
-                    path_info=request.url.to_text(),
-                    method=request.method,
+                rule, kwargs = adapter.match(
+                    path_info=path, method=request.method, return_rule=True,
                 )
             except werkzeug.routing.RequestRedirect as redirect_exception:
-                return lambda request: redirect(
+                return _Redirect(
                     to=redirect_exception.new_url,
                     code=redirect_exception.code,
-                )
+                ), None
             except werkzeug.routing.HTTPException:
-                return None
+                return None, None
             else:
+                render = self._endpoints[rule.endpoint]
                 if kwargs:
                     render = partial(render, **kwargs)
-                return render
+                return render, rule.rule
+
+        def ordering(self):
+            """
+            The rule strings of the map's rules, in the order they're tried.
+
+            Returns:
+
+                list: the rule strings, or ``None`` if the map does not try
+                its rules in order (as is the case for newer versions of
+                Werkzeug, which match using a state machine)
+
+            """
+
+            if getattr(self._map, "_matcher", None) is not None:
+                return None
+            self._map.update()
+            return [rule.rule for rule in self._map._rules]
+
+        def reorder(self):
+            """
+            Reorder the map's rules by how many requests they've matched.
+
+            Rules are only moved ahead of others which cannot match any of
+            the same paths (those whose static prefixes diverge), so the
+            result of matching any path is unchanged.
+
+            Returns:
+
+                list: the new :meth:`ordering`
+
+            """
+
+            if self.statistics is None:
+                raise ValueError("Reordering requires statistics.")
+            if getattr(self._map, "_matcher", None) is not None:
+                return None
+
+            self._map.update()
+            self._map._rules = _by_frequency(
+                rules=self._map._rules,
+                template=lambda rule: rule.rule,
+                hits=self.statistics.hits,
+            )
+            return self.ordering()
 
         def lookup(self, route_name, **kwargs):
+            """
+            Build a URL directly from the rules registered for the route.
+
+            Only URLs which need a host (e.g. for rules on other subdomains)
+            are built via the map adapter.
+
+            """
+
+            values = dict(
+                (k, v) for k, v in items(kwargs) if v is not None
+            )
+            subdomain = self._adapter.subdomain
+            for rule in self._builders.get(route_name, ()):
+                if not rule.suitable_for(values):
+                    continue
+                built = rule.build(values)
+                if built is not None and built[0] == subdomain:
+                    return str(built[1])
+                break
+
             try:
                 return self._adapter.build(route_name, kwargs)
             except werkzeug.routing.BuildError:
@@ -153,12 +1070,29 @@ class TraversalMapper(object):
     """
     Object-traversal based mapper for traversal of resource objects.
 
+    Arguments:
+
+        root:
+
+            the root resource to traverse
+
+        static_mapper:
+
+            a mapper to consult before traversing, which routes will be added
+            to. If unprovided, a :class:`SimpleMapper` will be used.
+
+        cache (minion.traversal.TraversalCache):
+
+            if provided, a cache used to reuse the results of traversing
+            previously seen paths
+
     """
 
-    def __init__(self, root, static_mapper=None):
+    def __init__(self, root, static_mapper=None, cache=None):
         if static_mapper is None:
             static_mapper = SimpleMapper()
         self.root = root
+        self.cache = cache
 
         self.static_mapper = static_mapper
         self.add = static_mapper.add
@@ -168,9 +1102,22 @@ class TraversalMapper(object):
         static_render = self.static_mapper.map(request=request, path=path)
         if static_render is not None:
             return static_render
-        resource = traverse(path=path, request=request, resource=self.root)
+        if self.cache is not None:
+            resource = self.cache.traverse(
+                path=path, request=request, resource=self.root,
+            )
+        else:
+            resource = traverse(path=path, request=request, resource=self.root)
         return resource.render
 
+    def freeze(self):
+        freeze = getattr(self.static_mapper, "freeze", None)
+        if freeze is None:
+            return self
+        return self.__class__(
+            root=self.root, static_mapper=freeze(), cache=self.cache,
+        )
+
 
 class SimpleMapper(object):
     """
@@ -194,5 +1141,322 @@ class SimpleMapper(object):
     def lookup(self, route_name, **kwargs):
         url = self._names.get(route_name, route_name)
         if kwargs:
-            url += b"?" + urlencode(items(kwargs))
+            url += b"?" + urlencode(kwargs)
         return url
+
+    def freeze(self):
+        views = dict(
+            ((method, route), fn)
+            for method, routes in items(self._routes)
+            for route, fn in items(routes)
+        )
+        return FrozenMapper(views=views, names=dict(self._names))
+
+
+class FrozenMapper(object):
+    """
+    An immutable mapper which maps via a single flat table of views.
+
+    Arguments:
+
+        views (dict):
+
+            a mapping from ``(method, path)`` pairs to the view to map to
+
+        names (dict):
+
+            a mapping from route names to the paths they were added at
+
+    """
+
+    def __init__(self, views, names):
+        self._views = views
+        self._names = names
+
+    def add(self, route, *args, **kwargs):
+        raise AlreadyFrozen(route)
+
+    def map(self, request, path):
+        return self._views.get((request.method, path))
+
+    def lookup(self, route_name, **kwargs):
+        url = self._names.get(route_name, route_name)
+        if kwargs:
+            url += b"?" + urlencode(kwargs)
+        return url
+
+    def freeze(self):
+        return self
+
+
+def _int_converter(segment):
+    if not segment.isdigit():
+        raise ValueError(segment)
+    return int(segment)
+
+
+def _string_converter(segment):
+    if not segment:
+        raise ValueError(segment)
+    return segment
+
+
+class _Node(object):
+    """
+    A node in a :class:`TrieMapper`\ 's trie, corresponding to one segment.
+
+    """
+
+    __slots__ = ("static", "parameters", "rest", "views")
+
+    def __init__(self):
+        self.static = {}
+        self.parameters = []
+        self.rest = []
+        self.views = {}
+
+    def child(self, segment):
+        if isinstance(segment, bytes):
+            child = self.static.get(segment)
+            if child is None:
+                child = self.static[segment] = _Node()
+            return child
+
+        converter, name = segment
+        children = self.rest if converter is None else self.parameters
+        for each in children:
+            if each[:2] == segment:
+                return each[-1]
+        child = _Node()
+        children.append(segment + (child,))
+        return child
+
+
+class TrieMapper(object):
+    """
+    A mapper which compiles routes into a trie keyed by path segment.
+
+    Routes may contain placeholders occupying an entire segment, of the
+    form ``<name>`` or ``<converter:name>``\ , which are passed to views as
+    keyword arguments. The available converters are ``string`` (the
+    default, any non-empty segment), ``int`` and ``path`` (the remainder
+    of the path, slashes included), along with any additional ones passed
+    in as callables which take a segment and return a converted value or
+    raise :exc:`ValueError` to reject it.
+
+    Mapping a path costs time proportional to its number of segments rather
+    than to the number of routes. Static segments take precedence over
+    placeholders, which take precedence (in the order they were added) over
+    ``path`` placeholders.
+
+    Arguments:
+
+        converters (dict):
+
+            additional converters to make available to placeholders, by name
+
+        statistics (RouteStatistics):
+
+            if provided, used to record which routes requests match
+
+    """
+
+    def __init__(self, converters=None, statistics=None):
+        self._converters = {"int": _int_converter, "string": _string_converter}
+        if converters is not None:
+            self._converters.update(converters)
+        self.statistics = statistics
+        self._builders = {}
+        self._frozen = False
+        self._root = _Node()
+        self._static = {}
+
+    def _parse(self, route):
+        segments = []
+        for segment in route.split(b"/"):
+            if segments and isinstance(segments[-1], tuple) and (
+                segments[-1][0] is None
+            ):
+                raise ValueError(
+                    "path placeholders must come last: {!r}".format(route),
+                )
+
+            if not segment.startswith(b"<") or not segment.endswith(b">"):
+                if b"<" in segment:
+                    raise ValueError(
+                        "Placeholders must be entire segments: {!r}".format(
+                            route,
+                        ),
+                    )
+                segments.append(segment)
+                continue
+
+            converter, _, name = segment[1:-1].rpartition(b":")
+            converter = converter.decode("ascii") or "string"
+            name = name.decode("ascii")
+            if converter == "path":
+                segments.append((None, name))
+                continue
+
+            convert = self._converters.get(converter)
+            if convert is None:
+                raise ValueError(
+                    "Unknown converter {!r} in {!r}".format(converter, route),
+                )
+            segments.append((convert, name))
+        return segments
+
+    def add(self, route, fn, route_name=None, methods=(b"GET", b"HEAD")):
+        if self._frozen:
+            raise AlreadyFrozen(route)
+
+        segments = self._parse(route)
+        node = self._root
+        for segment in segments:
+            node = node.child(segment)
+        for method in methods:
+            node.views[method] = fn, route
+        if route_name is not None:
+            self._builders[route_name] = _compile_builder(segments)
+
+        # Routes without placeholders always take precedence when mapping,
+        # so they can also be kept in a flat table and mapped in one lookup.
+        if all(isinstance(segment, bytes) for segment in segments):
+            for method in methods:
+                self._static[method, route] = fn, route
+
+    def map(self, request, path):
+        statistics = self.statistics
+        if statistics is None:
+            return self._map(request=request, path=path)[0]
+
+        start = default_timer()
+        render, route = self._map(request=request, path=path)
+        statistics.record(route, default_timer() - start)
+        return render
+
+    def probe(self, request, path):
+        """
+        Map a request as :meth:`map` would, without recording it in the
+        mapper's statistics.
+
+        """
+
+        return self._map(request=request, path=path)[0]
+
+    def _map(self, request, path):
+        found = self._static.get((request.method, path))
+        if found is not None:
+            return found
+
+        arguments = {}
+        found = _match(
+            node=self._root,
+            segments=path.split(b"/"),
+            index=0,
+            method=request.method,
+            arguments=arguments,
+        )
+        if found is None:
+            return None, None
+        render, route = found
+        if arguments:
+            render = partial(render, **arguments)
+        return render, route
+
+    def lookup(self, route_name, **kwargs):
+        build = self._builders.get(route_name)
+        if build is None:
+            url = route_name
+        else:
+            url = build(kwargs)
+            if url is None:
+                return route_name
+        if kwargs:
+            url += b"?" + urlencode(kwargs)
+        return url
+
+    def freeze(self):
+        self._frozen = True
+        return self
+
+
+def _compile_builder(segments):
+    """
+    Compile parsed route segments into a function which builds URLs for them.
+
+    The function takes a dict of placeholder values, removing the ones it uses
+    from it, and returns the built URL, or ``None`` if a value was missing.
+
+    """
+
+    # Alternating static parts and (name, safe characters) placeholders.
+    pieces, static = [], []
+    for segment in segments:
+        if isinstance(segment, bytes):
+            static.append(segment)
+        else:
+            static.append(b"")
+            pieces.append(b"/".join(static))
+            static = [b""]
+            converter, name = segment
+            pieces.append((name, b"/" if converter is None else b""))
+    pieces.append(b"/".join(static))
+
+    if len(pieces) == 1:
+        url, = pieces
+        return lambda values: url
+
+    first, placeholders = pieces[0], list(zip(pieces[1::2], pieces[2::2]))
+
+    def build(values):
+        parts = [first]
+        for (name, safe), static in placeholders:
+            value = values.pop(name, None)
+            if value is None:
+                return None
+            if not isinstance(value, bytes):
+                value = text_type(value).encode("utf-8")
+            value = quote(value, safe=safe)
+            if not isinstance(value, bytes):
+                value = value.encode("ascii")
+            parts.append(value)
+            parts.append(static)
+        return b"".join(parts)
+    return build
+
+
+def _match(node, segments, index, method, arguments):
+    """
+    Find the view (and route) for the given segments beneath the given node.
+
+    Any placeholder values are collected into the given arguments.
+
+    """
+
+    if index == len(segments):
+        return node.views.get(method)
+
+    segment = segments[index]
+    child = node.static.get(segment)
+    if child is not None:
+        render = _match(child, segments, index + 1, method, arguments)
+        if render is not None:
+            return render
+
+    for convert, name, child in node.parameters:
+        try:
+            value = convert(segment)
+        except ValueError:
+            continue
+        render = _match(child, segments, index + 1, method, arguments)
+        if render is not None:
+            arguments[name] = value
+            return render
+
+    rest = b"/".join(segments[index:])
+    for _, name, child in node.rest:
+        render = child.views.get(method)
+        if render is not None and rest:
+            arguments[name] = rest
+            return render
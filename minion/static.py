@@ -0,0 +1,230 @@
+"""
+Serving static files.
+
+"""
+
+import mimetypes
+import os
+
+from future.utils import text_type
+from werkzeug.http import http_date
+import attr
+
+from minion.cache import LRUCache
+from minion.compression import _parse_accept_encoding
+from minion.http import Headers, not_modified
+from minion.request import FileResponse, Response
+
+
+@attr.s
+class StaticFiles(object):
+    """
+    A router which serves the files beneath a directory.
+
+    It is meant to be mounted (see :class:`minion.routing.PrefixRouter`\ ),
+    e.g. at ``/static``\ , so that requests for static files never reach any
+    views.
+
+    Each file is stat'ed only once, after which its metadata (including a
+    strong ETag and its modification time) is cached, so files which change
+    will not be noticed until :meth:`clear` is called. Conditional requests
+    are answered with 304s, and ``.gz`` siblings of files are served instead
+    of them to clients which accept gzip.
+
+    Arguments:
+
+        directory (str):
+
+            the directory to serve files from
+
+        max_cached_size (int):
+
+            the size (in bytes) of the largest file to keep in memory. Larger
+            files are sent via :class:`minion.request.FileResponse`\ .
+
+        contents (minion.cache.LRUCache):
+
+            a cache to keep the contents of files in. If unprovided, one with
+            a budget of 16MiB will be used.
+
+        max_age (int):
+
+            if provided, the number of seconds clients may cache files for
+
+    """
+
+    directory = attr.ib(converter=os.path.realpath)
+    max_cached_size = attr.ib(default=64 * 1024)
+    contents = attr.ib(
+        default=attr.Factory(
+            lambda: LRUCache(maxsize=4096, maxweight=16 * 1024 * 1024),
+        ),
+        repr=False,
+    )
+    max_age = attr.ib(default=None)
+    _assets = attr.ib(
+        default=attr.Factory(lambda: LRUCache(maxsize=4096)),
+        init=False,
+        repr=False,
+    )
+
+    def route(self, request, path):
+        if request.method not in (b"GET", b"HEAD"):
+            return Response(
+                code=405, headers=Headers([("Allow", [b"GET, HEAD"])]),
+            )
+
+        asset = self._assets.get(path, _MISSING)
+        if asset is _MISSING:
+            asset = self._assets[path] = self._stat(path)
+        if asset is None:
+            return Response(code=404)
+
+        if asset.gzipped is not None:
+            header = request.headers.get("Accept-Encoding")
+            if header:
+                qualities = _parse_accept_encoding(b",".join(header))
+                if qualities.get(b"gzip", qualities.get(b"*", 0)) > 0:
+                    asset = asset.gzipped
+
+        if not_modified(
+            request.headers, etag=asset.etag, last_modified=asset.mtime,
+        ):
+            return Response(content=b"", code=304, headers=asset.headers)
+
+        if request.method == b"HEAD":
+            headers = asset.headers.mutable()
+            headers["Content-Length"] = [str(asset.size).encode("ascii")]
+            return Response(content=b"", headers=headers)
+
+        if asset.size > self.max_cached_size:
+            return FileResponse(open(asset.path, "rb"), headers=asset.headers)
+
+        content = self.contents.get(asset.path)
+        if content is None:
+            with open(asset.path, "rb") as file:
+                content = self.contents[asset.path] = file.read()
+        return Response(content=content, headers=asset.headers)
+
+    def lookup(self, route_name, **kwargs):
+        """
+        Build the (unmounted) URL of the given file.
+
+        """
+
+        if isinstance(route_name, text_type):
+            route_name = route_name.encode("utf-8")
+        return b"/" + route_name.lstrip(b"/")
+
+    def clear(self):
+        """
+        Forget the metadata and contents of all files seen so far.
+
+        """
+
+        self._assets.clear()
+        self.contents.clear()
+
+    def _stat(self, path):
+        """
+        Find the file at the given path, if it's within the directory.
+
+        """
+
+        segments = path.strip(b"/").split(b"/")
+        for segment in segments:
+            if segment in (b"", b".", b"..") or b"\0" in segment:
+                return None
+            if b"\\" in segment:
+                return None
+        if isinstance(self.directory, text_type):
+            segments = [segment.decode("utf-8") for segment in segments]
+
+        filesystem_path = os.path.join(self.directory, *segments)
+        real_path = os.path.realpath(filesystem_path)
+        if not real_path.startswith(os.path.join(self.directory, "")):
+            return None
+
+        asset = _asset_at(real_path, headers=self._headers_for(real_path))
+        if asset is None:
+            return None
+
+        gzipped = _asset_at(
+            real_path + ".gz",
+            headers=self._headers_for(real_path, encoding=b"gzip"),
+            suffix=b"-gzip",
+        )
+        if gzipped is not None:
+            vary = [("Vary", [b"Accept-Encoding"])]
+            asset = attr.evolve(
+                asset,
+                gzipped=attr.evolve(
+                    gzipped, headers=Headers(gzipped.headers_pairs + vary),
+                ),
+                headers=Headers(asset.headers_pairs + vary),
+            )
+        return asset
+
+    def _headers_for(self, path, encoding=None):
+        content_type, _ = mimetypes.guess_type(path)
+        if content_type is None:
+            content_type = "application/octet-stream"
+        headers = [("Content-Type", [content_type.encode("ascii")])]
+        if encoding is not None:
+            headers.append(("Content-Encoding", [encoding]))
+        if self.max_age is not None:
+            headers.append(
+                (
+                    "Cache-Control",
+                    [b"public, max-age=" + str(self.max_age).encode("ascii")],
+                ),
+            )
+        return headers
+
+
+_MISSING = object()
+
+
+@attr.s(frozen=True)
+class _Asset(object):
+    """
+    A static file, along with the headers to serve it with.
+
+    """
+
+    path = attr.ib()
+    size = attr.ib()
+    mtime = attr.ib()
+    etag = attr.ib()
+    headers_pairs = attr.ib(repr=False)
+    headers = attr.ib(repr=False)
+    gzipped = attr.ib(default=None)
+
+
+def _asset_at(path, headers, suffix=b""):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if not os.path.isfile(path):
+        return None
+
+    mtime = int(stat.st_mtime)
+    etag = b'"' + "{:x}-{:x}".format(
+        int(stat.st_mtime * 1000000), stat.st_size,
+    ).encode("ascii") + suffix + b'"'
+    last_modified = http_date(mtime)
+    if not isinstance(last_modified, bytes):
+        last_modified = last_modified.encode("ascii")
+    headers = headers + [
+        ("ETag", [etag]),
+        ("Last-Modified", [last_modified]),
+    ]
+    return _Asset(
+        path=path,
+        size=stat.st_size,
+        mtime=mtime,
+        etag=etag,
+        headers_pairs=headers,
+        headers=Headers(headers),
+    )
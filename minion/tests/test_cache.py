@@ -0,0 +1,285 @@
+from unittest import TestCase
+
+from hyperlink import URL
+
+from minion.cache import LRUCache, ResponseCache
+from minion.http import Headers, MutableHeaders
+from minion.request import Request, Response
+
+
+class TestLRUCache(TestCase):
+    def test_get(self):
+        cache = LRUCache()
+        cache[b"foo"] = 12
+        self.assertEqual(cache.get(b"foo"), 12)
+
+    def test_get_missing(self):
+        default = object()
+        self.assertIs(LRUCache().get(b"foo", default), default)
+
+    def test_contains(self):
+        cache = LRUCache()
+        cache[b"foo"] = 12
+        self.assertEqual((b"foo" in cache, b"bar" in cache), (True, False))
+
+    def test_it_evicts_the_least_recently_used_entry(self):
+        cache = LRUCache(maxsize=2)
+        cache[b"foo"] = 1
+        cache[b"bar"] = 2
+        cache.get(b"foo")
+        cache[b"baz"] = 3
+        self.assertEqual(
+            (b"foo" in cache, b"bar" in cache, b"baz" in cache, len(cache)),
+            (True, False, True, 2),
+        )
+
+    def test_overwriting_an_entry_does_not_grow_the_cache(self):
+        cache = LRUCache(maxsize=2)
+        cache[b"foo"] = 1
+        cache[b"foo"] = 2
+        self.assertEqual((cache.get(b"foo"), len(cache)), (2, 1))
+
+    def test_it_counts_hits_and_misses(self):
+        cache = LRUCache()
+        cache[b"foo"] = 1
+        cache.get(b"foo")
+        cache.get(b"foo")
+        cache.get(b"bar")
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_pop(self):
+        cache = LRUCache()
+        cache[b"foo"] = 1
+        self.assertEqual((cache.pop(b"foo"), cache.pop(b"foo")), (1, None))
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache[b"foo"] = 1
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_it_evicts_to_stay_within_its_weight(self):
+        cache = LRUCache(maxweight=10)
+        cache[b"foo"] = b"12345"
+        cache[b"bar"] = b"1234"
+        cache.get(b"foo")
+        cache[b"baz"] = b"123"
+        self.assertEqual(
+            (b"foo" in cache, b"bar" in cache, b"baz" in cache, cache.weight),
+            (True, False, True, 8),
+        )
+
+    def test_entries_heavier_than_the_maximum_are_not_stored(self):
+        cache = LRUCache(maxweight=2)
+        cache[b"foo"] = b"123"
+        self.assertEqual((b"foo" in cache, cache.weight), (False, 0))
+
+    def test_weighted_pop_and_clear(self):
+        cache = LRUCache(maxweight=10, weigh=lambda value: value)
+        cache[b"foo"] = 3
+        cache[b"bar"] = 4
+        self.assertEqual((cache.pop(b"foo"), cache.weight), (3, 4))
+        cache.clear()
+        self.assertEqual((len(cache), cache.weight), (0, 0))
+
+
+def request(method=b"GET", url=u"http://example.com/", **headers):
+    return Request(
+        url=URL.from_text(url),
+        method=method,
+        headers=Headers(
+            (name.replace("_", "-"), [value])
+            for name, value in headers.items()
+        ),
+    )
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.cache = ResponseCache(clock=self.clock)
+
+    def test_get(self):
+        response = Response(b"hello")
+        self.cache.store(request(), response, ttl=10)
+        self.assertEqual(self.cache.get(request()), response)
+
+    def test_stored_responses_are_copied(self):
+        response = Response(b"hello")
+        self.cache.store(request(), response, ttl=10)
+        response.set_cookie(b"session", b"secret")
+        response.headers["X-Foo"] = [b"bar"]
+        self.assertEqual(self.cache.get(request()), Response(b"hello"))
+
+    def test_served_responses_are_copied(self):
+        self.cache.store(request(), Response(b"hello"), ttl=10)
+        served = self.cache.get(request())
+        served.set_cookie(b"session", b"secret")
+        served.headers["X-Foo"] = [b"bar"]
+        self.assertEqual(self.cache.get(request()), Response(b"hello"))
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get(request()))
+
+    def test_keyed_on_method_path_and_query(self):
+        self.cache.store(request(), Response(b"hello"), ttl=10)
+        self.assertEqual(
+            [
+                self.cache.get(req)
+                for req in [
+                    request(method=b"HEAD"),
+                    request(url=u"http://example.com/foo"),
+                    request(url=u"http://example.com/?foo=bar"),
+                ]
+            ],
+            [None, None, None],
+        )
+
+    def test_keyed_on_scheme_host_and_port(self):
+        self.cache.store(
+            request(url=u"http://a.example.com/"), Response(b"A"), ttl=10,
+        )
+        self.assertEqual(
+            [
+                self.cache.get(request(url=url))
+                for url in [
+                    u"http://a.example.com/",
+                    u"http://b.example.com/",
+                    u"https://a.example.com/",
+                    u"http://a.example.com:8080/",
+                ]
+            ],
+            [Response(b"A"), None, None, None],
+        )
+
+    def test_vary(self):
+        english = Response(
+            b"hello",
+            headers=MutableHeaders([("Vary", [b"Accept-Language"])]),
+        )
+        french = Response(
+            b"bonjour",
+            headers=MutableHeaders([("Vary", [b"Accept-Language"])]),
+        )
+        self.cache.store(request(Accept_Language=b"en"), english, ttl=10)
+        self.cache.store(request(Accept_Language=b"fr"), french, ttl=10)
+        self.assertEqual(
+            [
+                self.cache.get(request(Accept_Language=b"en")),
+                self.cache.get(request(Accept_Language=b"fr")),
+                self.cache.get(request(Accept_Language=b"de")),
+            ],
+            [english, french, None],
+        )
+
+    def test_vary_star(self):
+        response = Response(
+            b"hello", headers=MutableHeaders([("Vary", [b"*"])]),
+        )
+        self.cache.store(request(), response, ttl=10)
+        self.assertIsNone(self.cache.get(request()))
+
+    def test_expiry(self):
+        self.cache.store(request(), Response(b"hello"), ttl=10)
+        self.clock.now = 10
+        self.assertIsNone(self.cache.get(request()))
+
+    def test_not_expired(self):
+        self.cache.store(request(), Response(b"hello"), ttl=10)
+        self.clock.now = 9
+        self.assertIsNotNone(self.cache.get(request()))
+
+    def test_uncacheable(self):
+        redirect = Response(code=302)
+        cookie = Response(b"hello")
+        cookie.set_cookie(b"foo", b"bar")
+        streamed = Response(iter([b"hello"]))
+
+        results = []
+        for response in redirect, cookie, streamed:
+            self.cache.store(request(), response, ttl=10)
+            results.append(self.cache.get(request()))
+        self.assertEqual(results, [None, None, None])
+
+    def test_private_responses(self):
+        results = []
+        for directive in b"private", b"No-Store", b"max-age=60, no-cache":
+            self.cache.store(
+                request(),
+                Response(
+                    b"hello",
+                    headers=MutableHeaders(
+                        [("Cache-Control", [directive])],
+                    ),
+                ),
+                ttl=10,
+            )
+            results.append(self.cache.get(request()))
+        self.assertEqual(results, [None, None, None])
+
+    def test_authorized_requests(self):
+        self.cache.store(request(Authorization=b"alice"), Response(b"hi"), 10)
+        self.cache.store(request(), Response(b"hello"), ttl=10)
+        self.assertEqual(
+            (
+                self.cache.get(request()),
+                self.cache.get(request(Authorization=b"alice")),
+            ),
+            (Response(b"hello"), None),
+        )
+
+    def test_byte_budget(self):
+        cache = ResponseCache(maxweight=10)
+        for path in u"a", u"b":
+            cache.store(
+                request(url=u"http://example.com/" + path),
+                Response(b"123456"),
+                ttl=10,
+            )
+        self.assertEqual(
+            (
+                cache.get(request(url=u"http://example.com/a")),
+                cache.get(request(url=u"http://example.com/b")),
+            ),
+            (None, Response(b"123456")),
+        )
+
+    def test_purge(self):
+        self.cache.store(
+            request(url=u"http://example.com/a"),
+            Response(b"a"),
+            ttl=10,
+            tags=[u"letters"],
+        )
+        self.cache.store(
+            request(url=u"http://example.com/b"),
+            Response(b"b"),
+            ttl=10,
+            tags=[u"other"],
+        )
+        self.cache.purge(u"letters")
+        self.assertEqual(
+            (
+                self.cache.get(request(url=u"http://example.com/a")),
+                self.cache.get(request(url=u"http://example.com/b")),
+            ),
+            (None, Response(b"b")),
+        )
+
+    def test_store_after_purge(self):
+        self.cache.purge(u"letters")
+        self.cache.store(request(), Response(b"a"), ttl=10, tags=[u"letters"])
+        self.assertEqual(self.cache.get(request()), Response(b"a"))
+
+    def test_clear(self):
+        self.cache.store(request(), Response(b"hello"), ttl=10)
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(request()))
@@ -0,0 +1,160 @@
+from unittest import TestCase
+import gzip
+import io
+import zlib
+
+from hyperlink import URL
+
+from minion.compression import Compressor
+from minion.http import Headers, MutableHeaders
+from minion.request import Request, Response
+
+
+CONTENT = b"Hello world! " * 100
+
+
+def html(content=CONTENT, **headers):
+    headers.setdefault("Content_Type", [b"text/html; charset=utf-8"])
+    return Response(
+        content=content,
+        headers=MutableHeaders(
+            (name.replace("_", "-"), values)
+            for name, values in headers.items()
+        ),
+    )
+
+
+def request(accept_encoding=b"gzip, deflate"):
+    return Request(
+        url=URL(path=[u""]),
+        headers=Headers([("Accept-Encoding", [accept_encoding])]),
+    )
+
+
+def gunzip(content):
+    return gzip.GzipFile(fileobj=io.BytesIO(content)).read()
+
+
+class TestCompressor(TestCase):
+    def setUp(self):
+        self.compressor = Compressor()
+
+    def test_gzip(self):
+        response = self.compressor.compress(request(), html())
+        self.assertEqual(
+            (
+                gunzip(response.content),
+                response.headers.get("Content-Encoding"),
+                response.headers.get("Vary"),
+            ),
+            (CONTENT, [b"gzip"], [b"Accept-Encoding"]),
+        )
+
+    def test_deflate(self):
+        response = self.compressor.compress(
+            request(accept_encoding=b"deflate"), html(),
+        )
+        self.assertEqual(
+            (
+                zlib.decompress(response.content),
+                response.headers.get("Content-Encoding"),
+            ),
+            (CONTENT, [b"deflate"]),
+        )
+
+    def test_preferred_encoding(self):
+        response = self.compressor.compress(
+            request(accept_encoding=b"gzip;q=0.5, deflate"), html(),
+        )
+        self.assertEqual(
+            response.headers.get("Content-Encoding"), [b"deflate"],
+        )
+
+    def test_wildcard(self):
+        response = self.compressor.compress(
+            request(accept_encoding=b"*, gzip;q=0"), html(),
+        )
+        self.assertEqual(
+            response.headers.get("Content-Encoding"), [b"deflate"],
+        )
+
+    def test_not_accepted(self):
+        original = html()
+        response = self.compressor.compress(
+            request(accept_encoding=b"identity"), original,
+        )
+        self.assertEqual(
+            (
+                response.content,
+                response.headers.get("Content-Encoding"),
+                response.headers.get("Vary"),
+                original.headers.get("Vary"),
+            ),
+            (CONTENT, None, [b"Accept-Encoding"], None),
+        )
+
+    def test_too_small(self):
+        original = html(content=b"Hello world!")
+        self.assertIs(self.compressor.compress(request(), original), original)
+
+    def test_uncompressible_content_type(self):
+        original = html(Content_Type=[b"image/png"])
+        self.assertIs(self.compressor.compress(request(), original), original)
+
+    def test_already_encoded(self):
+        original = html(Content_Encoding=[b"br"])
+        self.assertIs(self.compressor.compress(request(), original), original)
+
+    def test_existing_vary(self):
+        response = self.compressor.compress(request(), html(Vary=[b"Accept"]))
+        self.assertEqual(
+            response.headers.get("Vary"), [b"Accept", b"Accept-Encoding"],
+        )
+
+    def test_content_length_and_etag(self):
+        response = self.compressor.compress(
+            request(),
+            html(Content_Length=[b"1300"], ETag=[b'"abc"']),
+        )
+        self.assertEqual(
+            (
+                response.headers.get("Content-Length"),
+                response.headers.get("ETag"),
+            ),
+            ([str(len(response.content)).encode("ascii")], [b'W/"abc"']),
+        )
+
+    def test_it_caches_compressed_bodies(self):
+        first = self.compressor.compress(request(), html())
+        second = self.compressor.compress(request(), html())
+        self.assertEqual(
+            (first.content, self.compressor.cache.hits), (second.content, 1),
+        )
+
+    def test_head_below_the_minimum_size(self):
+        compressor = Compressor(minimum_size=100)
+        response = html(content=b"", Content_Length=[b"5"])
+        head = Request(
+            url=URL(path=[u""]),
+            method=b"HEAD",
+            headers=Headers([("Accept-Encoding", [b"gzip"])]),
+        )
+        self.assertIs(compressor.compress(head, response), response)
+
+    def test_head_of_unknown_size(self):
+        head = Request(
+            url=URL(path=[u""]),
+            method=b"HEAD",
+            headers=Headers([("Accept-Encoding", [b"gzip"])]),
+        )
+        response = self.compressor.compress(head, html(content=b""))
+        self.assertEqual(
+            (
+                response.headers.get("Content-Encoding"),
+                response.headers.get("Vary"),
+            ),
+            ([b"gzip"], [b"Accept-Encoding"]),
+        )
+
+    def test_the_default_cache_is_bounded_by_size(self):
+        self.assertIsNotNone(Compressor().cache.maxweight)
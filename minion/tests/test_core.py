@@ -1,4 +1,5 @@
 from unittest import TestCase, skipIf
+import zlib
 
 from future.utils import iteritems
 from hyperlink import URL
@@ -9,6 +10,9 @@ except ImportError:
     jinja2 = None
 
 from minion import core, assets
+from minion.cache import ResponseCache
+from minion.compression import Compressor
+from minion.http import Headers
 from minion.request import Manager, Request, Response
 from minion.routing import Router, SimpleMapper
 
@@ -97,3 +101,92 @@ class TestApplicationIntegration(TestCase):
         self.assertEqual(
             self.app.serve(self.request, path=self.request.url.path).code, 404,
         )
+
+    def test_it_compresses_responses(self):
+        self.app.compressor = Compressor(minimum_size=0)
+        self.router.add(
+            self.request.url.path,
+            lambda request: Response(
+                content=b"Hello",
+                headers=Headers([("Content-Type", [b"text/plain"])]),
+            ),
+        )
+        request = Request(
+            url=URL(path=[u""]),
+            headers=Headers([("Accept-Encoding", [b"deflate"])]),
+        )
+        response = self.app.serve(request, path=request.url.path)
+        self.assertEqual(zlib.decompress(response.content), b"Hello")
+
+    def test_after_response_callbacks_can_replace_the_response(self):
+        def view(request):
+            self.manager.after_response(
+                request, lambda response: Response(b"Goodbye"),
+            )
+            return Response(b"Hello")
+
+        self.router.add(self.request.url.path, view)
+        self.assertEqual(
+            self.app.serve(self.request, path=self.request.url.path),
+            Response(b"Goodbye"),
+        )
+
+    def test_failed_requests_are_cleaned_up(self):
+        def view(request):
+            self.manager.after_response(request, lambda response: 1 / 0)
+            raise ValueError()
+
+        self.router.add(self.request.url.path, view)
+        with self.assertRaises(ValueError):
+            self.app.serve(self.request, path=self.request.url.path)
+        self.assertIsNone(self.request._request_context)
+
+    def test_cached_responses_do_not_leak_cookies(self):
+        router = Router(mapper=SimpleMapper(), response_cache=ResponseCache())
+        app = core.Application(manager=self.manager, router=router)
+
+        def view(request):
+            if request.headers.get("Authorization"):
+                self.manager.after_response(
+                    request,
+                    lambda response: response.set_cookie(
+                        b"session", b"secret-for-alice",
+                    ),
+                )
+            return Response(b"Hello")
+
+        router.add(self.request.url.path, view, cache_ttl=60)
+        alice = Request(
+            url=URL(path=[u""]),
+            headers=Headers([("Authorization", [b"alice"])]),
+        )
+        alices = app.serve(alice, path=self.request.url.path)
+        anonymous = app.serve(self.request, path=self.request.url.path)
+        self.assertEqual(
+            (len(alices.cookies), anonymous.cookies), (1, []),
+        )
+
+    def test_head_gets_the_same_encoding_headers_as_get(self):
+        self.app.compressor = Compressor(minimum_size=0)
+        self.router.add(
+            self.request.url.path,
+            lambda request: Response(
+                content=b"Hello",
+                headers=Headers([("Content-Type", [b"text/plain"])]),
+            ),
+        )
+        request = Request(
+            url=URL(path=[u""]),
+            method=b"HEAD",
+            headers=Headers([("Accept-Encoding", [b"gzip"])]),
+        )
+        response = self.app.serve(request, path=request.url.path)
+        self.assertEqual(
+            (
+                response.content,
+                response.headers.get("Content-Encoding"),
+                response.headers.get("Vary"),
+                response.headers.get("Content-Length"),
+            ),
+            (b"", [b"gzip"], [b"Accept-Encoding"], None),
+        )
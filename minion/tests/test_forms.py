@@ -0,0 +1,85 @@
+from unittest import TestCase
+import io
+
+from minion.forms import FormParser, FormTooLarge
+
+
+_MISSING = object()
+MULTIPART = b"multipart/form-data; boundary=xyz"
+URLENCODED = b"application/x-www-form-urlencoded"
+
+
+def upload(content):
+    return (
+        b"--xyz\r\n"
+        b'Content-Disposition: form-data; name="upload"; '
+        b'filename="hello.txt"\r\n'
+        b"Content-Type: text/plain\r\n\r\n" +
+        content +
+        b"\r\n--xyz--\r\n"
+    )
+
+
+class TestFormParser(TestCase):
+    def parse(self, parser, content_type, body, content_length=_MISSING):
+        if content_length is _MISSING:
+            content_length = len(body)
+        return parser.parse(
+            content=io.BytesIO(body),
+            content_type=content_type,
+            content_length=content_length,
+        )
+
+    def test_urlencoded(self):
+        form, files = self.parse(FormParser(), URLENCODED, b"foo=bar")
+        self.assertEqual((form[u"foo"], list(files)), (u"bar", []))
+
+    def test_no_content_type(self):
+        form, files = self.parse(FormParser(), None, b"foo=bar")
+        self.assertEqual((list(form), list(files)), ([], []))
+
+    def test_small_uploads_stay_in_memory(self):
+        _, files = self.parse(
+            FormParser(spool_size=1024), MULTIPART, upload(b"Hello"),
+        )
+        stream = files[u"upload"].stream
+        self.assertEqual(
+            (stream.read(), stream._rolled), (b"Hello", False),
+        )
+
+    def test_large_uploads_are_spooled(self):
+        _, files = self.parse(
+            FormParser(spool_size=1024), MULTIPART, upload(b"x" * 4096),
+        )
+        stream = files[u"upload"].stream
+        self.assertEqual(
+            (stream.read(), stream._rolled), (b"x" * 4096, True),
+        )
+
+    def test_max_size(self):
+        with self.assertRaises(FormTooLarge):
+            self.parse(FormParser(max_size=10), MULTIPART, upload(b"Hello"))
+
+    def test_max_size_undeclared_length(self):
+        with self.assertRaises(FormTooLarge):
+            self.parse(
+                FormParser(max_size=10),
+                MULTIPART,
+                upload(b"Hello"),
+                content_length=None,
+            )
+
+    def test_max_memory_size(self):
+        with self.assertRaises(FormTooLarge):
+            self.parse(
+                FormParser(max_memory_size=100 * 1024),
+                URLENCODED,
+                b"foo=" + b"x" * 200 * 1024,
+            )
+
+    def test_max_memory_size_does_not_limit_uploads(self):
+        content = b"x" * 300 * 1024
+        _, files = self.parse(
+            FormParser(max_memory_size=100 * 1024), MULTIPART, upload(content),
+        )
+        self.assertEqual(files[u"upload"].read(), content)
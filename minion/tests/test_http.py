@@ -2,6 +2,7 @@ from unittest import TestCase
 
 from future.utils import PY3
 from pyrsistent import pmap
+import attr
 
 from minion import http
 
@@ -124,6 +125,46 @@ class HeaderRetrievalTestsMixin(object):
             repr(headers), "<" + self.Headers.__name__ + " contents={}>",
         )
 
+    def test_serialized(self):
+        headers = self.Headers(
+            [(b"content-type", [b"text/plain"]), (b"vary", [b"A", b"B"])],
+        )
+        self.assertEqual(
+            sorted(headers.serialized()),
+            [(b"Content-Type", b"text/plain"), (b"Vary", b"A,B")],
+        )
+
+    def test_serialized_returns_new_lists(self):
+        headers = self.Headers([(b"foo", [b"bar"])])
+        headers.serialized().append((b"Baz", b"quux"))
+        self.assertEqual(headers.serialized(), [(b"Foo", b"bar")])
+
+    def test_it_indexes_lazily(self):
+        consumed = []
+
+        def contents():
+            for name in [b"Foo", b"Bar"]:
+                consumed.append(name)
+                yield name, [b"baz"]
+
+        headers = self.Headers(contents())
+        self.assertEqual(consumed, [])
+        self.assertEqual(
+            (headers.get(b"foo"), headers[b"BAR"], b"quux" in headers),
+            ([b"baz"], [b"baz"], False),
+        )
+        self.assertEqual(consumed, [b"Foo", b"Bar"])
+
+    def test_mutable(self):
+        headers = self.Headers([(b"foo", [b"bar"])])
+        mutable = headers.mutable()
+        mutable.add_value(b"foo", b"baz")
+        mutable[b"quux"] = [b"spam"]
+        self.assertEqual(
+            (headers.get(b"foo"), b"quux" in headers, mutable.get(b"foo")),
+            ([b"bar"], False, [b"bar", b"baz"]),
+        )
+
 
 class TestMutableHeaders(HeaderRetrievalTestsMixin, TestCase):
 
@@ -138,6 +179,12 @@ class TestMutableHeaders(HeaderRetrievalTestsMixin, TestCase):
         self.assertIn(b"thing", headers)
         self.assertEqual(headers.get(b"thing"), [b"hello", b"world"])
 
+    def test_serialized_after_mutation(self):
+        headers = self.Headers([(b"foo", [b"bar"])])
+        headers.serialized()
+        headers.add_value(b"foo", b"baz")
+        self.assertEqual(headers.serialized(), [(b"Foo", b"bar,baz")])
+
     def test_add_value(self):
         headers = self.Headers([(b"foo", [b"bar"])])
         headers.add_value(b"foo", b"baz")
@@ -199,7 +246,120 @@ class TestImmutableHeaders(HeaderRetrievalTestsMixin, TestCase):
         self.assertEqual(some_headers, set([self.Headers()]))
 
 
+class TestCookies(TestCase):
+    def test_it_parses_cookies(self):
+        cookies = http.Cookies(header=[b"foo=bar; baz=\"quux\"", b"a=b"])
+        self.assertEqual(
+            (cookies[b"foo"], cookies[b"baz"], cookies.get(b"a")),
+            (b"bar", b"quux", b"b"),
+        )
+
+    def test_the_first_cookie_wins(self):
+        cookies = http.Cookies(header=[b"foo=bar; foo=baz"])
+        self.assertEqual(cookies[b"foo"], b"bar")
+
+    def test_missing(self):
+        cookies = http.Cookies(header=[b"foo=bar; invalid"])
+        self.assertEqual(
+            (b"invalid" in cookies, cookies.get(b"quux", 12)), (False, 12),
+        )
+        with self.assertRaises(KeyError):
+            cookies[b"quux"]
+
+    def test_no_header(self):
+        self.assertNotIn(b"foo", http.Cookies())
+
+    def test_it_tracks_the_names_read(self):
+        cookies = http.Cookies(header=[b"foo=bar; baz=quux"])
+        cookies.get(b"foo")
+        b"spam" in cookies
+        self.assertEqual(cookies.read, set([b"foo", b"spam"]))
+
+    def test_it_parses_lazily(self):
+        class Header(object):
+            def __iter__(this):
+                self.parsed.append(True)
+                return iter([b"foo=bar"])
+
+        self.parsed = []
+        cookies = http.Cookies(header=Header())
+        self.assertEqual(self.parsed, [])
+        cookies.get(b"foo")
+        cookies.get(b"foo")
+        self.assertEqual(self.parsed, [True])
+
+
+class TestSetCookie(TestCase):
+    def test_serialize(self):
+        cookie = http.SetCookie(name=b"foo", value=b"bar")
+        self.assertEqual(cookie.serialize(), b"foo=bar")
+
+    def test_serialize_attributes(self):
+        cookie = http.SetCookie(
+            name=b"foo",
+            value=b"bar",
+            max_age=60,
+            expires=0,
+            path=b"/",
+            domain=b"example.com",
+            secure=True,
+            http_only=True,
+            same_site=b"Lax",
+        )
+        self.assertEqual(
+            cookie.serialize(),
+            b"foo=bar; Max-Age=60; Expires=Thu, 01 Jan 1970 00:00:00 GMT; "
+            b"Path=/; Domain=example.com; Secure; HttpOnly; SameSite=Lax",
+        )
+
+    def test_invalid_values(self):
+        with self.assertRaises(ValueError):
+            http.SetCookie(name=b"foo", value=b"bar; Secure")
+
+    def test_invalid_names(self):
+        for name in [b"", b"foo=bar", b"foo bar", b"foo;", b"f(o)o", b"\r\n"]:
+            with self.assertRaises(ValueError):
+                http.SetCookie(name=name, value=b"bar")
+
+    def test_invalid_attributes(self):
+        for attribute in [b"/\r\nX-Evil: 1", b"/; Secure", b"/\x00"]:
+            for name in "path", "domain", "same_site":
+                with self.assertRaises(ValueError):
+                    http.SetCookie(b"foo", b"bar", **{name: attribute})
+
+
 class TestAccept(TestCase):
+    def test_it_caches_parsed_headers(self):
+        header = b"text/html, application/xhtml+xml;q=0.9"
+        self.assertIs(
+            http.Accept.from_header(header=header),
+            http.Accept.from_header(header=header),
+        )
+
+    def test_it_is_immutable(self):
+        accept = http.Accept.from_header(header=b"text/html;level=1")
+        with self.assertRaises(attr.exceptions.FrozenInstanceError):
+            accept.media_types = ()
+        with self.assertRaises(attr.exceptions.FrozenInstanceError):
+            accept.media_types[0].quality = 0.5
+        with self.assertRaises(TypeError):
+            accept.media_types[0].parameters[b"level"] = b"2"
+
+    def test_media_ranges_are_hashable(self):
+        accept = http.Accept.from_header(header=b"text/html;level=1")
+        self.assertEqual(
+            set(accept.media_types),
+            set(
+                [
+                    http.MediaRange(
+                        type=b"text",
+                        subtype=b"html",
+                        parameters={b"level": b"1"},
+                    ),
+                ],
+            ),
+        )
+
     def test_basic(self):
         accept = http.Accept.from_header(header=b"application/json")
         media_range = http.MediaRange(
@@ -280,6 +440,53 @@ class TestAccept(TestCase):
         accept = http.Accept.from_header(header=None)
         self.assertEqual(accept, http.Accept.ALL)
 
+    def test_best_match(self):
+        accept = http.Accept.from_header(
+            header=b"text/html, application/xhtml+xml;q=0.9, */*;q=0.8",
+        )
+        self.assertEqual(
+            accept.best_match((b"application/xhtml+xml", b"text/html")),
+            b"text/html",
+        )
+
+    def test_best_match_breaks_ties_by_order(self):
+        accept = http.Accept.from_header(header=b"text/*")
+        self.assertEqual(
+            accept.best_match((b"text/plain", b"text/html")), b"text/plain",
+        )
+
+    def test_best_match_uses_the_most_specific_range(self):
+        accept = http.Accept.from_header(header=b"text/*, text/html;q=0.1")
+        self.assertEqual(
+            accept.best_match((b"text/html", b"text/plain")), b"text/plain",
+        )
+
+    def test_best_match_parameters(self):
+        accept = http.Accept.from_header(
+            header=b"text/html;level=1, text/html;q=0.5",
+        )
+        self.assertEqual(
+            accept.best_match((b"text/html", b"text/html;level=1")),
+            b"text/html;level=1",
+        )
+
+    def test_best_match_none_acceptable(self):
+        accept = http.Accept.from_header(header=b"text/html, image/*;q=0")
+        self.assertIsNone(accept.best_match((b"image/png", b"text/plain")))
+
+    def test_best_match_no_header(self):
+        self.assertEqual(
+            http.Accept.from_header(header=None).best_match((b"image/png",)),
+            b"image/png",
+        )
+
+    def test_best_match_is_memoized(self):
+        accept = http.Accept.from_header(header=b"text/html")
+        accept.best_match((b"text/html",))
+        self.assertEqual(
+            accept._best_matches, {(b"text/html",): b"text/html"},
+        )
+
 
 class TestMediaRange(TestCase):
     def test_eq(self):
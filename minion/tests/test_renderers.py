@@ -141,6 +141,74 @@ class TestJSON(TestCase):
             ),
         )
 
+    def test_head_requests_are_rendered_like_get_requests(self):
+        render = renderers.bind(renderers.JSON(), to=lambda _: [1, 2])
+        get = Request(url=URL(path=[u""]))
+        head = Request(url=URL(path=[u""]), method=b"HEAD")
+        self.assertEqual(render(head), render(get))
+
+
+class TestNegotiated(TestCase):
+    def setUp(self):
+        self.renderer = renderers.Negotiated(
+            renderers=[
+                (b"text/plain", renderers.UTF8),
+                (b"application/json", renderers.JSON()),
+            ],
+        )
+        self.render = renderers.bind(self.renderer, to=lambda _: u"hi")
+
+    def request(self, accept, method=b"GET"):
+        return Request(
+            url=URL(path=[u""]),
+            method=method,
+            headers=Headers([("Accept", [accept])]),
+        )
+
+    def test_it_renders_via_the_best_match(self):
+        response = self.render(self.request(accept=b"text/plain"))
+        self.assertEqual(
+            (response.content, response.headers.get("Vary")),
+            (b"hi", [b"Accept"]),
+        )
+
+    def test_it_breaks_ties_in_order(self):
+        response = self.render(self.request(accept=b"*/*"))
+        self.assertEqual(response.content, b"hi")
+
+    def test_it_renders_other_types(self):
+        response = self.render(self.request(accept=b"application/json"))
+        self.assertEqual(
+            (response.content, response.headers.get("Content-Type")),
+            (b'"hi"', ["application/json"]),
+        )
+
+    def test_nothing_acceptable(self):
+        response = self.render(self.request(accept=b"image/png"))
+        self.assertEqual(response.code, 406)
+
+    def test_head(self):
+        class Renderer(object):
+            def render(self, request, returned):
+                raise ZeroDivisionError()
+
+            def render_head(self, request, returned):
+                return Response(code=204)
+
+        render = renderers.bind(
+            renderers.Negotiated(renderers=[(b"text/plain", Renderer())]),
+            to=lambda _: u"hi",
+        )
+        response = render(self.request(accept=b"text/plain", method=b"HEAD"))
+        self.assertEqual(
+            (response.code, response.headers.get("Vary")), (204, [b"Accept"]),
+        )
+
+    def test_produces(self):
+        self.assertEqual(
+            self.renderer.produces, (b"text/plain", b"application/json"),
+        )
+
 
 class TestSimpleJSON(TestCase):
 
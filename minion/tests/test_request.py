@@ -1,10 +1,13 @@
 from unittest import TestCase
+import io
+import tempfile
+import threading
 import mock
 
 from hyperlink import URL
 
 from minion import request
-from minion.http import Accept, Headers
+from minion.http import Accept, Headers, MutableHeaders
 from minion.tests.utils import ResponseHelpersMixin
 
 
@@ -71,6 +74,108 @@ class TestManager(TestCase):
         self.assertEqual(response, self.response)
         self.assertEqual(response.thing, 4)
 
+    def test_request_failed(self):
+        request_ = request.Request(url=URL(path=[u""]))
+        callback = mock.Mock()
+        self.manager.request_started(request_)
+        self.manager.after_response(request_, callback)
+        self.manager.request_failed(request_)
+        self.assertEqual(
+            (callback.called, request_._request_context), (False, None),
+        )
+
+    def test_after_response_for_unstarted_requests(self):
+        request_ = request.Request(url=URL(path=[u""]))
+        with self.assertRaises(LookupError):
+            self.manager.after_response(request_, mock.Mock())
+
+    def test_nested_managers(self):
+        inner = request.Manager()
+        request_ = request.Request(url=URL(path=[u""]))
+        called = []
+
+        self.manager.request_started(request_)
+        inner.request_started(request_)
+        self.manager.after_response(request_, lambda r: called.append("out"))
+        inner.after_response(request_, lambda r: called.append("in"))
+        inner.request_served(request_, self.response)
+        self.assertEqual(called, ["in"])
+        self.manager.request_served(request_, self.response)
+        self.assertEqual(
+            (called, request_._request_context), (["in", "out"], None),
+        )
+
+    def test_after_sent(self):
+        request_ = request.Request(url=URL(path=[u""]))
+        callback = mock.Mock(return_value=12)
+
+        self.manager.request_started(request_)
+        self.manager.after_sent(request_, callback, 1, kw="abc")
+        response = self.manager.request_served(request_, self.response)
+        self.assertFalse(callback.called)
+
+        request.response_sent(request_, response)
+        callback.assert_called_once_with(self.response, 1, kw="abc")
+
+    def test_after_sent_runs_once(self):
+        request_ = request.Request(url=URL(path=[u""]))
+        callback = mock.Mock()
+
+        self.manager.request_started(request_)
+        self.manager.after_sent(request_, callback)
+        self.manager.request_served(request_, self.response)
+        request.response_sent(request_, self.response)
+        request.response_sent(request_, self.response)
+        self.assertEqual(callback.call_count, 1)
+
+    def test_after_sent_with_an_executor(self):
+        executor = mock.Mock()
+        manager = request.Manager(executor=executor)
+        request_ = request.Request(url=URL(path=[u""]))
+        callback = mock.Mock()
+
+        manager.request_started(request_)
+        manager.after_sent(request_, callback, 1)
+        manager.request_served(request_, self.response)
+        request.response_sent(request_, self.response)
+        self.assertEqual(
+            (callback.called, executor.submit.call_args),
+            (False, mock.call(callback, self.response, 1)),
+        )
+
+    def test_response_sent_without_callbacks(self):
+        request_ = request.Request(url=URL(path=[u""]))
+        request.response_sent(request_, self.response)
+
+    def test_concurrent_requests(self):
+        threads, requests_per_thread = 16, 200
+        start = threading.Event()
+        errors = []
+
+        def serve(thread):
+            start.wait()
+            for i in range(requests_per_thread):
+                request_ = request.Request(url=URL(path=[u""]))
+                expected = thread, i
+                self.manager.request_started(request_)
+                self.manager.after_response(
+                    request_, lambda response, expected=expected: expected,
+                )
+                response = self.manager.request_served(request_, None)
+                if response != expected:
+                    errors.append((expected, response))
+
+        workers = [
+            threading.Thread(target=serve, args=(thread,))
+            for thread in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        start.set()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(errors, [])
+
 
 class RequestTestMixin(object):
     """
@@ -92,11 +197,90 @@ class RequestTestMixin(object):
         request = self.make_request(headers=Headers([("accept", [accept])]))
         self.assertIs(request.accept, request.accept)
 
+    def test_cookies(self):
+        request = self.make_request(
+            headers=Headers([("cookie", [b"foo=bar; baz=quux"])]),
+        )
+        self.assertEqual(
+            (request.cookies[b"foo"], request.cookies.get(b"baz")),
+            (b"bar", b"quux"),
+        )
+
+    def test_cookies_no_header(self):
+        request = self.make_request(headers=Headers())
+        self.assertNotIn(b"foo", request.cookies)
+
+    def test_cookies_are_calculated_once(self):
+        request = self.make_request(
+            headers=Headers([("cookie", [b"foo=bar"])]),
+        )
+        self.assertIs(request.cookies, request.cookies)
+
+    def test_form(self):
+        request = self.make_request_with_body(
+            content_type=b"application/x-www-form-urlencoded",
+            body=b"foo=bar&foo=baz&quux=%20",
+        )
+        self.assertEqual(
+            (request.form.getlist(u"foo"), request.form[u"quux"]),
+            ([u"bar", u"baz"], u" "),
+        )
+
+    def test_files(self):
+        request = self.make_request_with_body(
+            content_type=b"multipart/form-data; boundary=xyz",
+            body=(
+                b"--xyz\r\n"
+                b'Content-Disposition: form-data; name="foo"\r\n\r\n'
+                b"bar\r\n"
+                b"--xyz\r\n"
+                b'Content-Disposition: form-data; name="upload"; '
+                b'filename="hello.txt"\r\n'
+                b"Content-Type: text/plain\r\n\r\n"
+                b"Hello world\r\n"
+                b"--xyz--\r\n"
+            ),
+        )
+        upload = request.files[u"upload"]
+        self.assertEqual(
+            (request.form[u"foo"], upload.filename, upload.read()),
+            (u"bar", u"hello.txt", b"Hello world"),
+        )
+
+    def test_form_without_a_body(self):
+        request = self.make_request(headers=Headers())
+        self.assertEqual((list(request.form), list(request.files)), ([], []))
+
 
 class TestRequest(RequestTestMixin, TestCase):
     def make_request(self, headers):
         return request.Request(url=URL(path=[u""]), headers=headers)
 
+    def make_request_with_body(self, content_type, body):
+        return request.Request(
+            url=URL(path=[u""]),
+            content=io.BytesIO(body),
+            headers=Headers(
+                [
+                    ("Content-Type", [content_type]),
+                    ("Content-Length", [str(len(body)).encode("ascii")]),
+                ],
+            ),
+        )
+
+    def test_form_with_a_malformed_content_length(self):
+        form = request.Request(
+            url=URL(path=[u""]),
+            content=io.BytesIO(b"foo=bar"),
+            headers=Headers(
+                [
+                    ("Content-Type", [b"application/x-www-form-urlencoded"]),
+                    ("Content-Length", [b"nope"]),
+                ],
+            ),
+        ).form
+        self.assertEqual(list(form), [])
+
     def test_url(self):
         self.request = request.Request(url=URL(path=[u"foo", u"bar"]))
         self.assertEqual(self.request.url, URL(path=[u"foo", u"bar"]))
@@ -117,6 +301,34 @@ class TestResponse(TestCase):
     def test_init_kwargs(self):
         self.assertEqual(request.Response(content=b"Hello").content, b"Hello")
 
+    def test_set_cookie(self):
+        response = request.Response(
+            headers=MutableHeaders([(b"Content-Type", [b"text/plain"])]),
+        )
+        response.set_cookie(b"foo", b"bar", http_only=True)
+        response.set_cookie(b"baz", b"quux", path=b"/")
+        self.assertEqual(
+            response.serialized_headers(), [
+                (b"Content-Type", b"text/plain"),
+                (b"Set-Cookie", b"foo=bar; HttpOnly"),
+                (b"Set-Cookie", b"baz=quux; Path=/"),
+            ],
+        )
+
+
+class TestFileResponse(TestCase):
+    def test_content_length(self):
+        file = tempfile.TemporaryFile()
+        self.addCleanup(file.close)
+        file.write(b"Hello world")
+        file.seek(6)
+        response = request.FileResponse(file)
+        self.assertEqual(response.content_length, 5)
+
+    def test_unknown_content_length(self):
+        response = request.FileResponse(io.BytesIO(b"Hello"))
+        self.assertIsNone(response.content_length)
+
 
 class TestRedirect(ResponseHelpersMixin, TestCase):
     def test_it_returns_redirect_responses(self):
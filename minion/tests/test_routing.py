@@ -1,12 +1,25 @@
 from unittest import TestCase, skipIf
+import hashlib
+import io
 import json
+import tempfile
 
 from future.utils import PY3
 from hyperlink import URL
 
 from minion import routing
-from minion.request import Request, Response, redirect
-from minion.traversal import LeafResource
+from minion.core import Application
+from minion.forms import FormParser
+from minion.http import Headers, MutableHeaders
+from minion.cache import LRUCache, ResponseCache
+from minion.renderers import JSON
+from minion.request import FileResponse, Request, Response, redirect
+from minion.traversal import LeafResource, TraversalCache, TreeResource
+
+try:
+    import werkzeug.routing
+except ImportError:
+    pass
 
 
 class ReverseRenderer(object):
@@ -33,6 +46,26 @@ class TestRouter(TestCase):
         response = self.router.route(request, path=b"/404")
         self.assertEqual(response, Response(code=404))
 
+    def test_form_too_large(self):
+        self.router.add(
+            b"/", lambda request: Response(request.form[u"foo"]),
+            methods=[b"POST"],
+        )
+        request = Request(
+            url=URL(path=[u""]),
+            method=b"POST",
+            content=io.BytesIO(b"foo=bar"),
+            headers=Headers(
+                [
+                    ("Content-Type", [b"application/x-www-form-urlencoded"]),
+                    ("Content-Length", [b"7"]),
+                ],
+            ),
+            form_parser=FormParser(max_size=3),
+        )
+        response = self.router.route(request, path=b"/")
+        self.assertEqual(response, Response(code=413))
+
     def test_specified_renderer(self):
         self.router.add(b"/", view, renderer=ReverseRenderer())
         request = Request(url=URL(path=[u""]))
@@ -92,6 +125,636 @@ class TestRouter(TestCase):
         self.assertEqual(response, Response(b"IndexError"))
 
 
+class TestRouterImplicitMethods(TestCase):
+    def setUp(self):
+        self.router = routing.Router(mapper=routing.SimpleMapper())
+
+    def route(self, path, method):
+        request = Request(url=URL(path=[u""]), method=method)
+        return self.router.route(request, path=path)
+
+    def test_head_strips_the_body(self):
+        self.router.add(b"/", lambda request: Response(b"hello"))
+        response = self.route(b"/", method=b"HEAD")
+        self.assertEqual(
+            (response.content, response.headers.get("Content-Length")),
+            (b"", [b"5"]),
+        )
+
+    def test_head_closes_iterable_bodies(self):
+        closed = []
+
+        def chunks():
+            try:
+                yield b"hello"
+            finally:
+                closed.append(True)
+
+        def view(request):
+            body = chunks()
+            next(body)
+            return Response(body)
+
+        self.router.add(b"/", view)
+        response = self.route(b"/", method=b"HEAD")
+        self.assertEqual((response.content, closed), (b"", [True]))
+
+    def test_head_file_responses(self):
+        file = tempfile.TemporaryFile()
+        file.write(b"Hello world")
+        file.seek(0)
+        self.router.add(b"/", lambda request: FileResponse(file))
+        response = self.route(b"/", method=b"HEAD")
+        self.assertEqual(
+            (
+                response,
+                file.closed,
+            ), (
+                Response(
+                    content=b"",
+                    headers=MutableHeaders([("Content-Length", [b"11"])]),
+                ),
+                True,
+            ),
+        )
+
+    def test_head_falls_back_to_get(self):
+        self.router.add(b"/", view, methods=[b"GET"])
+        response = self.route(b"/", method=b"HEAD")
+        self.assertEqual(
+            (response.code, response.content), (200, b""),
+        )
+
+    def test_head_does_not_fall_back_to_other_methods(self):
+        self.router.add(b"/", view, methods=[b"POST"])
+        self.assertEqual(self.route(b"/", method=b"HEAD").code, 404)
+
+    def test_head_keeps_an_explicit_content_length(self):
+        def view(request):
+            return Response(
+                content=b"abc",
+                headers=MutableHeaders([("Content-Length", [b"12"])]),
+            )
+        self.router.add(b"/", view)
+        response = self.route(b"/", method=b"HEAD")
+        self.assertEqual(response.headers.get("Content-Length"), [b"12"])
+
+    @skipIf(PY3, "JSON renders text rather than bytes on Py3")
+    def test_head_json_content_length(self):
+        self.router.add(b"/", lambda request: [1, 2], renderer=JSON())
+        get = self.route(b"/", method=b"GET")
+        head = self.route(b"/", method=b"HEAD")
+        self.assertEqual(
+            head.headers.get("Content-Length"),
+            [str(len(get.content)).encode("ascii")],
+        )
+
+    def test_head_uses_render_head(self):
+        class Renderer(object):
+            def render(self, request, returned):
+                raise ZeroDivisionError()
+
+            def render_head(self, request, returned):
+                return Response(code=204)
+
+        self.router.add(b"/", view, renderer=Renderer())
+        response = self.route(b"/", method=b"HEAD")
+        self.assertEqual(response.code, 204)
+
+    def test_options(self):
+        self.router.add(b"/", view)
+        self.router.add(b"/", view, methods=[b"POST"])
+        self.router.add(b"/other", view, methods=[b"PUT"])
+        response = self.route(b"/", method=b"OPTIONS")
+        self.assertEqual(
+            (response.code, response.headers.get("Allow")),
+            (200, [b"GET, HEAD, OPTIONS, POST"]),
+        )
+
+    def test_options_unknown_route(self):
+        self.router.add(b"/", view)
+        self.assertEqual(self.route(b"/404", method=b"OPTIONS").code, 404)
+
+    def test_options_route(self):
+        self.router.add(b"/", view, methods=[b"OPTIONS"])
+        self.assertEqual(
+            self.route(b"/", method=b"OPTIONS"), view(request=None),
+        )
+
+    def test_options_does_not_skew_statistics(self):
+        statistics = routing.RouteStatistics()
+        self.router.mapper = routing.TrieMapper(statistics=statistics)
+        self.router.add(b"/", view)
+        self.router.add(b"/", view, methods=[b"POST"])
+        self.route(b"/", method=b"OPTIONS")
+        # Only the OPTIONS request itself (which has no route) is recorded.
+        self.assertEqual(
+            (dict(statistics.hits), statistics.misses), ({}, 1),
+        )
+
+    def test_options_is_recomputed_when_routes_are_added(self):
+        self.router.add(b"/", view, methods=[b"GET"])
+        self.route(b"/", method=b"OPTIONS")
+        self.router.add(b"/", view, methods=[b"DELETE"])
+        response = self.route(b"/", method=b"OPTIONS")
+        self.assertEqual(
+            response.headers.get("Allow"), [b"DELETE, GET, HEAD, OPTIONS"],
+        )
+
+    def test_disabled(self):
+        self.router.implicit_methods = False
+        self.router.add(b"/", view, methods=[b"GET"])
+        self.router.add(b"/head", lambda request: Response(b"hello"))
+        self.assertEqual(
+            (
+                self.route(b"/", method=b"HEAD").code,
+                self.route(b"/", method=b"OPTIONS").code,
+                self.route(b"/head", method=b"HEAD").content,
+            ),
+            (404, 404, b"hello"),
+        )
+
+
+class TestRouterConditional(TestCase):
+    def setUp(self):
+        self.router = routing.Router(
+            mapper=routing.SimpleMapper(), conditional=True,
+        )
+
+    def route(self, path, method=b"GET", **headers):
+        request = Request(
+            url=URL(path=[u""]),
+            method=method,
+            headers=Headers(
+                (name.replace("_", "-"), [value])
+                for name, value in headers.items()
+            ),
+        )
+        return self.router.route(request, path=path)
+
+    def test_weak_etag(self):
+        self.router.add(b"/", lambda request: Response(b"hello"))
+        etag = self.route(b"/").headers.get("ETag")
+        self.assertEqual(etag[0][:3], b'W/"')
+
+    def test_matching_etag(self):
+        self.router.add(b"/", lambda request: Response(b"hello"))
+        etag = self.route(b"/").headers.get("ETag")[0]
+        response = self.route(b"/", If_None_Match=etag)
+        self.assertEqual(
+            (response.code, response.content, response.headers.get("ETag")),
+            (304, b"", [etag]),
+        )
+
+    def test_changed_content(self):
+        contents = [b"hello", b"goodbye"]
+        self.router.add(b"/", lambda request: Response(contents.pop(0)))
+        etag = self.route(b"/").headers.get("ETag")[0]
+        response = self.route(b"/", If_None_Match=etag)
+        self.assertEqual(
+            (response.code, response.content), (200, b"goodbye"),
+        )
+
+    def test_explicit_etag(self):
+        def view(request):
+            return Response(
+                b"hello",
+                headers=MutableHeaders(
+                    [("ETag", [b'"v1"']), ("Content-Type", [b"text/plain"])],
+                ),
+            )
+        self.router.add(b"/", view)
+        response = self.route(b"/", If_None_Match=b'"v0", W/"v1"')
+        self.assertEqual(
+            (response.code, response.headers),
+            (304, MutableHeaders([("ETag", [b'"v1"'])])),
+        )
+
+    def test_last_modified(self):
+        def view(request):
+            return Response(
+                b"hello",
+                headers=MutableHeaders(
+                    [("Last-Modified", [b"Sun, 09 Sep 2001 01:46:40 GMT"])],
+                ),
+            )
+        self.router.add(b"/", view)
+        response = self.route(
+            b"/", If_Modified_Since=b"Sun, 09 Sep 2001 01:46:40 GMT",
+        )
+        self.assertEqual(response.code, 304)
+
+    def test_head(self):
+        self.router.add(b"/", lambda request: Response(b"hello"))
+        etag = self.route(b"/").headers.get("ETag")[0]
+        response = self.route(b"/", method=b"HEAD", If_None_Match=etag)
+        self.assertEqual(response.code, 304)
+
+    def test_head_rendered_without_a_body(self):
+        class Renderer(object):
+            def render(self, request, returned):
+                return Response(b"hello")
+
+            def render_head(self, request, returned):
+                return Response(
+                    headers=MutableHeaders([("Content-Length", [b"5"])]),
+                )
+
+        self.router.add(b"/", view, renderer=Renderer())
+        etag = self.route(b"/").headers.get("ETag")[0]
+        empty = b'W/"' + hashlib.sha1(b"").hexdigest().encode("ascii") + b'"'
+        responses = [
+            self.route(b"/", method=b"HEAD", If_None_Match=etag),
+            self.route(b"/", method=b"HEAD", If_None_Match=empty),
+        ]
+        self.assertEqual(
+            [
+                (response.code, response.headers.get("ETag"))
+                for response in responses
+            ],
+            [(200, None), (200, None)],
+        )
+
+    def test_other_methods_are_unconditional(self):
+        self.router.add(
+            b"/", lambda request: Response(b"hello"), methods=[b"POST"],
+        )
+        response = self.route(b"/", method=b"POST", If_None_Match=b"*")
+        self.assertEqual(
+            (response.code, response.headers.get("ETag")), (200, None),
+        )
+
+    def test_errors_are_unconditional(self):
+        self.router.add(b"/", lambda request: Response(b"no", code=400))
+        response = self.route(b"/", If_None_Match=b"*")
+        self.assertEqual(response.code, 400)
+
+    def test_validator_skips_the_view(self):
+        called = []
+
+        def view(request, **kwargs):
+            called.append(True)
+            return Response(b"hello")
+
+        self.router.add(b"/", view, validator=lambda request: b"v1")
+        response = self.route(b"/", If_None_Match=b'W/"v1"')
+        self.assertEqual(
+            (response.code, response.headers.get("ETag"), called),
+            (304, [b'W/"v1"'], []),
+        )
+
+    def test_validator_etag(self):
+        self.router.add(
+            b"/", lambda request: Response(b"hello"),
+            validator=lambda request: b"v2",
+        )
+        response = self.route(b"/", If_None_Match=b'W/"v1"')
+        self.assertEqual(
+            (response.code, response.headers.get("ETag")),
+            (200, [b'W/"v2"']),
+        )
+
+    def test_validator_with_unknown_version(self):
+        self.router.add(
+            b"/", lambda request: Response(b"hello"),
+            validator=lambda request: None,
+        )
+        response = self.route(b"/", If_None_Match=b"W/\"v1\"")
+        self.assertEqual(response.code, 200)
+
+    def test_validator_without_conditional(self):
+        router = routing.Router(mapper=routing.SimpleMapper())
+        router.add(
+            b"/", lambda request: Response(b"hello"),
+            validator=lambda request: b"v1",
+        )
+        request = Request(
+            url=URL(path=[u""]),
+            headers=Headers([("If-None-Match", [b'W/"v1"'])]),
+        )
+        self.assertEqual(router.route(request, path=b"/").code, 304)
+
+
+class TestRouterResponseCache(TestCase):
+    def setUp(self):
+        self.cache = ResponseCache()
+        self.router = routing.Router(
+            mapper=routing.SimpleMapper(), response_cache=self.cache,
+        )
+        self.calls = []
+
+    def view(self, request):
+        self.calls.append(request.method)
+        return Response(b"hello")
+
+    def route(self, method=b"GET"):
+        request = Request(url=URL(path=[u""]), method=method)
+        return self.router.route(request, path=b"/")
+
+    def test_cached(self):
+        self.router.add(b"/", self.view, cache_ttl=60)
+        responses = [self.route(), self.route()]
+        self.assertEqual(
+            (responses, self.calls),
+            ([Response(b"hello"), Response(b"hello")], [b"GET"]),
+        )
+
+    def test_other_methods_are_not_cached(self):
+        self.router.add(b"/", self.view, methods=[b"POST"], cache_ttl=60)
+        self.route(method=b"POST")
+        self.route(method=b"POST")
+        self.assertEqual(self.calls, [b"POST", b"POST"])
+
+    def test_uncached_routes(self):
+        self.router.add(b"/", self.view)
+        self.route()
+        self.route()
+        self.assertEqual(self.calls, [b"GET", b"GET"])
+
+    def test_purge(self):
+        self.router.add(b"/", self.view, cache_ttl=60, cache_tags=[u"hi"])
+        self.route()
+        self.cache.purge(u"hi")
+        self.route()
+        self.assertEqual(self.calls, [b"GET", b"GET"])
+
+    def test_no_response_cache(self):
+        router = routing.Router(mapper=routing.SimpleMapper())
+        with self.assertRaises(ValueError):
+            router.add(b"/", self.view, cache_ttl=60)
+
+
+class TestRouterProduces(TestCase):
+    def setUp(self):
+        self.router = routing.Router(mapper=routing.SimpleMapper())
+
+    def route(self, accept):
+        request = Request(
+            url=URL(path=[u""]),
+            headers=Headers([("Accept", [accept])]),
+        )
+        return self.router.route(request, path=b"/")
+
+    def test_acceptable(self):
+        self.router.add(b"/", view, produces=[b"text/html"])
+        self.assertEqual(self.route(accept=b"text/*").code, 200)
+
+    def test_unacceptable(self):
+        def boom(request):
+            raise ZeroDivisionError()
+
+        self.router.add(b"/", boom, produces=[b"text/html"])
+        self.assertEqual(self.route(accept=b"application/json").code, 406)
+
+    def test_renderer_produces(self):
+        class Renderer(ReverseRenderer):
+            produces = [b"text/plain"]
+
+        self.router.add(b"/", view, renderer=Renderer())
+        self.assertEqual(
+            (
+                self.route(accept=b"application/json").code,
+                self.route(accept=b"text/plain").code,
+            ),
+            (406, 200),
+        )
+
+
+class TestRouterFreeze(TestCase):
+    def setUp(self):
+        self.router = routing.Router(mapper=routing.SimpleMapper())
+
+    def test_it_routes_when_frozen(self):
+        self.router.add(b"/", view, renderer=ReverseRenderer())
+        self.router.add(b"/post", view, methods=[b"POST"])
+        self.router.freeze()
+
+        get = Request(url=URL(path=[u""]))
+        post = Request(url=URL(path=[u""]), method=b"POST")
+        self.assertEqual(
+            (
+                self.router.route(get, path=b"/"),
+                self.router.route(post, path=b"/post"),
+                self.router.route(get, path=b"/post"),
+                self.router.route(post, path=b"/404"),
+            ),
+            (
+                Response(b"}{"),
+                view(post),
+                Response(code=404),
+                Response(code=404),
+            ),
+        )
+
+    def test_it_freezes_the_mapper(self):
+        self.router.freeze()
+        self.assertIsInstance(self.router.mapper, routing.FrozenMapper)
+
+    def test_frozen_mappers_build_urls(self):
+        self.router.add(b"/", view, route_name=u"home")
+        self.router.freeze()
+        self.assertEqual(self.router.lookup(u"home"), b"/")
+
+    def test_adding_routes_to_frozen_routers_fails(self):
+        self.router.freeze()
+        with self.assertRaises(routing.AlreadyFrozen):
+            self.router.add(b"/", view)
+
+    def test_adding_routes_to_frozen_mappers_fails(self):
+        frozen = routing.SimpleMapper().freeze()
+        with self.assertRaises(routing.AlreadyFrozen):
+            frozen.add(b"/", view)
+
+    def test_mappers_without_freezing_support(self):
+        mapper = object()
+        router = routing.Router(mapper=mapper)
+        router.freeze()
+        with self.assertRaises(routing.AlreadyFrozen):
+            router.add(b"/", view)
+        self.assertIs(router.mapper, mapper)
+
+
+class TestRouterLookup(TestCase):
+    def setUp(self):
+        self.router = routing.Router(mapper=routing.SimpleMapper())
+
+    def test_lookup(self):
+        self.router.add(b"/", view, route_name=u"home")
+        self.assertEqual(self.router.lookup(u"home", a=b"b"), b"/?a=b")
+
+    def test_lookup_many(self):
+        self.router.add(b"/", view, route_name=u"home")
+        self.router.add(b"/about", view, route_name=u"about")
+        urls = self.router.lookup_many(
+            [(u"about", {}), (u"home", {u"a": b"b"}), (b"/other", {})],
+        )
+        self.assertEqual(urls, [b"/about", b"/?a=b", b"/other"])
+
+
+class TestPrefixRouter(TestCase):
+    def setUp(self):
+        self.default = routing.Router(mapper=routing.SimpleMapper())
+        self.router = routing.PrefixRouter(default=self.default)
+
+    def route(self, path, host=u"example.com"):
+        request = Request(url=URL(host=host, path=[u""]))
+        return self.router.route(request, path=path)
+
+    def test_it_routes_to_mounted_routers_without_their_prefix(self):
+        child = routing.Router(mapper=routing.SimpleMapper())
+        child.add(b"/hello", lambda request: Response(b"Hello"))
+        self.router.mount(b"/child", child)
+        self.assertEqual(self.route(b"/child/hello"), Response(b"Hello"))
+
+    def test_mounted_root(self):
+        child = routing.Router(mapper=routing.SimpleMapper())
+        child.add(b"/", lambda request: Response(b"Hello"))
+        self.router.mount(b"child", child)
+        self.assertEqual(
+            (self.route(b"/child"), self.route(b"/child/")),
+            (Response(b"Hello"), Response(b"Hello")),
+        )
+
+    def test_it_serves_mounted_applications(self):
+        application = Application()
+        served = []
+
+        @application.route(b"/hello")
+        def hello(request):
+            application.manager.after_response(request, served.append)
+            return Response(b"Hello")
+
+        self.router.mount(b"app", application)
+        request = Request(url=URL(path=[u""]))
+        response = self.router.route(request, path=b"/app/hello")
+        self.assertEqual((response, served), (Response(b"Hello"), [response]))
+
+    def test_unmounted_paths_use_the_default(self):
+        self.router.add(b"/hello", lambda request: Response(b"Hello"))
+        self.router.mount(b"child", routing.Router(routing.SimpleMapper()))
+        self.assertEqual(self.route(b"/hello"), Response(b"Hello"))
+
+    def test_no_default(self):
+        router = routing.PrefixRouter()
+        request = Request(url=URL(path=[u""]))
+        self.assertEqual(
+            router.route(request, path=b"/hello"), Response(code=404),
+        )
+
+    def test_host_mounts(self):
+        for host in u"example.com", u"example.org":
+            child = routing.Router(mapper=routing.SimpleMapper())
+            child.add(b"/", lambda request, host=host: Response(host))
+            self.router.mount(b"child", child, host=host)
+        self.assertEqual(
+            (
+                self.route(b"/child/", host=u"example.com"),
+                self.route(b"/child/", host=u"example.org"),
+                self.route(b"/child/", host=u"example.net"),
+            ),
+            (
+                Response(u"example.com"),
+                Response(u"example.org"),
+                Response(code=404),
+            ),
+        )
+
+    def test_host_mounts_take_precedence(self):
+        for host in u"example.com", None:
+            child = routing.Router(mapper=routing.SimpleMapper())
+            child.add(b"/", lambda request, host=host: Response(host))
+            self.router.mount(b"child", child, host=host)
+        self.assertEqual(
+            (
+                self.route(b"/child/", host=u"example.com"),
+                self.route(b"/child/", host=u"example.org"),
+            ),
+            (Response(u"example.com"), Response(None)),
+        )
+
+    def test_mounting_more_than_one_segment(self):
+        with self.assertRaises(ValueError):
+            self.router.mount(b"/foo/bar", self.default)
+
+    def test_lookup(self):
+        child = routing.Router(mapper=routing.SimpleMapper())
+        child.add(b"/hello", view, route_name=u"hello")
+        self.router.mount(b"child", child)
+        self.default.add(b"/bye", view, route_name=u"bye")
+        self.assertEqual(
+            self.router.lookup_many(
+                [(u"child:hello", {}), (u"bye", {}), (b"/literal", {})],
+            ),
+            [b"/child/hello", b"/bye", b"/literal"],
+        )
+
+    def test_lookup_namespace(self):
+        application = Application()
+        application.route(b"/hello", route_name=u"hello")(view)
+        self.router.mount(b"child", application, namespace=u"app")
+        self.assertEqual(self.router.lookup(u"app:hello"), b"/child/hello")
+
+    def test_lookup_unknown_name_in_namespace(self):
+        child = routing.Router(mapper=routing.SimpleMapper())
+        self.router.mount(b"child", child)
+        self.assertEqual(self.router.lookup(u"child:nope"), u"child:nope")
+
+    def test_add_without_default(self):
+        router = routing.PrefixRouter()
+        with self.assertRaises(ValueError):
+            router.add(b"/hello", view)
+
+
+class TestRouterRouteCache(TestCase):
+    def setUp(self):
+        self.mapper = routing.SimpleMapper()
+        self.cache = LRUCache()
+        self.router = routing.Router(
+            mapper=self.mapper, route_cache=self.cache,
+        )
+        self.mapped = []
+
+        def map(request, path):
+            self.mapped.append(path)
+            return routing.SimpleMapper.map(self.mapper, request, path)
+        self.mapper.map = map
+
+    def test_it_caches_mapped_views(self):
+        self.router.add(b"/", view)
+        request = Request(url=URL(path=[u""]))
+        responses = [self.router.route(request, path=b"/") for _ in range(3)]
+        self.assertEqual(
+            (responses, self.mapped, self.cache.hits, self.cache.misses),
+            ([view(request)] * 3, [b"/"], 2, 1),
+        )
+
+    def test_it_caches_unmapped_paths(self):
+        request = Request(url=URL(path=[u"404"]))
+        responses = [self.router.route(request, path=b"/404") for _ in "ab"]
+        self.assertEqual(
+            (responses, self.mapped), ([Response(code=404)] * 2, [b"/404"]),
+        )
+
+    def test_it_caches_per_method(self):
+        self.router.add(b"/", view, methods=[b"POST"])
+        get = Request(url=URL(path=[u""]), method=b"GET")
+        post = Request(url=URL(path=[u""]), method=b"POST")
+        self.assertEqual(
+            (
+                self.router.route(get, path=b"/"),
+                self.router.route(post, path=b"/"),
+            ),
+            (Response(code=404), view(post)),
+        )
+
+    def test_adding_routes_clears_the_cache(self):
+        request = Request(url=URL(path=[u""]))
+        self.router.route(request, path=b"/")
+        self.router.add(b"/", view)
+        response = self.router.route(request, path=b"/")
+        self.assertEqual((response, len(self.mapped)), (view(request), 2))
+
+
 class TestRouterDefaultRenderer(TestCase):
     def setUp(self):
         self.router = routing.Router(
@@ -184,6 +847,26 @@ class TestTraversalMapper(TestCase):
         render = mapper.map(request, path=b"/world")
         self.assertEqual(render(request), Response(content=b"Hello world"))
 
+    def test_it_caches_traversals(self):
+        root = TreeResource()
+        mapper = routing.TraversalMapper(root=root, cache=TraversalCache())
+        request = Request(url=URL(path=[u"world"]))
+        render = mapper.map(request, path=b"/world")
+        self.assertEqual(render(request).code, 404)
+
+        root.set_child(b"world", LeafResource(render=view))
+        self.assertEqual(mapper.map(request, path=b"/world"), view)
+
+    def test_freeze(self):
+        mapper = routing.TraversalMapper(root=LeafResource(render=None))
+        mapper.add(b"/", view)
+        frozen = mapper.freeze()
+        request = Request(url=URL(path=[u""]))
+        self.assertEqual(
+            (frozen.map(request, path=b"/"), frozen.static_mapper.__class__),
+            (view, routing.FrozenMapper),
+        )
+
 
 class TestTraversalMapperStatic(MapperTestMixin, TestCase):
     def setUp(self):
@@ -210,6 +893,79 @@ class TestRoutesMapper(MapperTestMixin, TestCase):
         url = self.mapper.lookup(b"year", year=2012)
         self.assertEqual(url, b"/2012")
 
+    def test_it_builds_static_routes_with_arguments(self):
+        self.mapper.add(b"/about", view, route_name=u"about")
+        url = self.mapper.lookup(b"about", year=2012)
+        self.assertEqual(url, b"/about?year=2012")
+
+    def test_it_builds_external_static_routes(self):
+        self.mapper.add(b"/hello", view, route_name=u"hello")
+        self.mapper.add(
+            b"http://example.com/", view, route_name=u"example", _static=True,
+        )
+        self.assertEqual(
+            (self.mapper.lookup(u"example"), self.mapper.lookup(u"hello")),
+            (b"http://example.com/", b"/hello"),
+        )
+
+    def test_replaced_named_routes_are_rebuilt(self):
+        self.mapper.add(b"/about", view, route_name=u"about")
+        self.mapper.add(b"/{year}", view, route_name=u"about")
+        url = self.mapper.lookup(b"about", year=2012)
+        self.assertEqual(url, b"/2012")
+
+
+@skipIf(not hasattr(routing, "RoutesMapper"), "Routes not found")
+@skipIf(PY3, "WSGI on Py3 is insanity")
+class TestRoutesMapperPathOnly(MapperTestMixin, TestCase):
+    def setUp(self):
+        self.cache = LRUCache()
+        self.mapper = routing.RoutesMapper(
+            path_only=True, match_cache=self.cache,
+        )
+
+    def test_it_matches_only_paths(self):
+        self.mapper.add(b"/route/{year}", view)
+        request = Request(
+            url=URL(scheme=u"http", host=u"example.com", path=[u"nope"]),
+        )
+        render = self.mapper.map(request, path=b"/route/2013")
+        self.assertEqual(
+            json.loads(render(request).content), {b"year": b"2013"},
+        )
+
+    def test_it_caches_matches(self):
+        self.mapper.add(b"/route/{year}", view)
+        request = Request(url=URL(path=[u""]))
+        renders = [self.mapper.map(request, b"/route/2013") for _ in "abc"]
+        self.mapper.map(request, b"/nope")
+        self.assertEqual(
+            (
+                [json.loads(render(request).content) for render in renders],
+                self.cache.hits,
+                self.cache.misses,
+            ),
+            ([{b"year": b"2013"}] * 3, 2, 2),
+        )
+
+    def test_adding_routes_clears_the_cache(self):
+        self.mapper.add(b"/route", view)
+        self.mapper.map(Request(url=URL(path=[u""])), b"/route")
+        self.mapper.add(b"/other", view)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_statistics(self):
+        statistics = routing.RouteStatistics()
+        mapper = routing.RoutesMapper(path_only=True, statistics=statistics)
+        mapper.add(b"/route/{year}", view)
+        request = Request(url=URL(path=[u""]))
+        for path in [b"/route/2013", b"/route/2014", b"/nope"]:
+            mapper.map(request, path)
+        self.assertEqual(
+            (dict(statistics.hits), statistics.misses),
+            ({b"/route/{year}": 2}, 1),
+        )
+
 
 @skipIf(not hasattr(routing, "WerkzeugMapper"), "Werkzeug not found")
 @skipIf(PY3, "WSGI on Py3 is insanity")
@@ -228,6 +984,12 @@ class TestWerkzeugMapper(MapperTestMixin, TestCase):
         url = self.mapper.lookup(u"year", year=2012)
         self.assertEqual(url, b"/2012")
 
+    def test_it_builds_routes_for_the_matching_rule(self):
+        self.mapper.add(b"/<int:year>", view, route_name=u"year")
+        self.mapper.add(b"/<int:year>/<int:month>", view, route_name=u"year")
+        url = self.mapper.lookup(u"year", year=2012, month=12)
+        self.assertEqual(url, b"/2012/12")
+
     def test_it_handles_routing_redirects(self):
         self.mapper.add(b"/<int:year>/", view)
         request = Request(url=URL(path=[u"2013"], rooted=True))
@@ -236,7 +998,332 @@ class TestWerkzeugMapper(MapperTestMixin, TestCase):
             render(request), redirect(b"http:///2013/", code=301),
         )
 
+    def test_it_redirects_to_the_requested_host(self):
+        self.mapper.add(b"/<int:year>/", view)
+        request = Request(
+            url=URL(
+                scheme=u"https",
+                host=u"example.com",
+                port=8443,
+                path=[u"2013"],
+            ),
+        )
+        render = self.mapper.map(request, path=b"/2013")
+        self.assertEqual(
+            render(request),
+            redirect(b"https://example.com:8443/2013/", code=301),
+        )
+
+    def test_host_matching(self):
+        mapper = routing.WerkzeugMapper(
+            map=werkzeug.routing.Map(host_matching=True),
+        )
+        mapper.add(b"/", view, host=u"<tenant>.example.com")
+        request = Request(
+            url=URL(scheme=u"http", host=u"foo.example.com", path=[u""]),
+        )
+        render = mapper.map(request, path=b"/")
+        self.assertEqual(
+            json.loads(render(request).content), {u"tenant": u"foo"},
+        )
+
+    def test_subdomains(self):
+        mapper = routing.WerkzeugMapper(server_name=u"example.com")
+        mapper.add(b"/", view, subdomain=u"<tenant>")
+        request = Request(
+            url=URL(scheme=u"http", host=u"foo.example.com", path=[u""]),
+        )
+        render = mapper.map(request, path=b"/")
+        self.assertEqual(
+            json.loads(render(request).content), {u"tenant": u"foo"},
+        )
+
+    def test_it_caches_adapters_per_host(self):
+        cache = LRUCache()
+        mapper = routing.WerkzeugMapper(adapter_cache=cache)
+        mapper.add(b"/", view)
+        for host in [u"example.com", u"example.com", u"example.org"]:
+            request = Request(
+                url=URL(scheme=u"http", host=host, path=[u""]),
+            )
+            mapper.map(request, path=b"/")
+        self.assertEqual((cache.hits, len(cache)), (1, 2))
+
+    def test_it_maps_named_routes(self):
+        self.mapper.add(b"/<int:year>", view, route_name=u"year")
+        request = Request(url=URL(path=[u"2013"], rooted=True))
+        render = self.mapper.map(request, path=b"/2013")
+        self.assertEqual(json.loads(render(request).content), {b"year": 2013})
+
+    def test_statistics(self):
+        statistics = routing.RouteStatistics()
+        mapper = routing.WerkzeugMapper(statistics=statistics)
+        mapper.add(b"/<int:year>", view)
+        request = Request(url=URL(path=[u""]))
+        for path in [b"/2013", b"/2014", b"/nope"]:
+            mapper.map(request, path=path)
+        self.assertEqual(
+            (dict(statistics.hits), statistics.misses),
+            ({u"/<int:year>": 2}, 1),
+        )
+        self.assertGreater(statistics.match_time, 0)
+
+    def test_probe(self):
+        mapper = routing.WerkzeugMapper(reorder_every=10)
+        mapper.add(b"/<int:year>", view)
+        request = Request(url=URL(path=[u""]))
+        render = mapper.probe(request, path=b"/2013")
+        self.assertEqual(
+            (
+                json.loads(render(request).content),
+                dict(mapper.statistics.hits),
+                mapper._until_reorder,
+            ),
+            ({b"year": 2013}, {}, 10),
+        )
+
+    def test_reorder(self):
+        mapper = routing.WerkzeugMapper()
+        mapper.add(b"/about", view)
+        mapper.add(b"/users/<name>", view)
+        mapper.add(b"/users/<name>/<int:id>", view)
+        mapper.add(b"/posts/<int:id>", view)
+        mapper.statistics = routing.RouteStatistics()
+        request = Request(url=URL(path=[u""]))
+        for path in [b"/posts/1", b"/posts/2", b"/users/foo/1"]:
+            mapper.map(request, path=path)
+
+        self.assertEqual(
+            mapper.reorder(), [
+                u"/posts/<int:id>",
+                u"/users/<name>/<int:id>",
+                u"/about",
+                u"/users/<name>",
+            ],
+        )
+
+    def test_adaptive_reordering(self):
+        mapper = routing.WerkzeugMapper(reorder_every=2)
+        mapper.add(b"/about", view)
+        mapper.add(b"/posts/<int:id>", view)
+        request = Request(url=URL(path=[u""]))
+        mapper.map(request, path=b"/posts/1")
+        self.assertEqual(mapper.ordering(), [u"/about", u"/posts/<int:id>"])
+        mapper.map(request, path=b"/posts/2")
+        self.assertEqual(mapper.ordering(), [u"/posts/<int:id>", u"/about"])
+        render = mapper.map(request, path=b"/about")
+        self.assertEqual(json.loads(render(request).content), {})
+
+
+@skipIf(not hasattr(routing, "WerkzeugMapper"), "Werkzeug not found")
+@skipIf(PY3, "WSGI on Py3 is insanity")
+class TestRouterRouteCacheWerkzeug(TestCase):
+    def setUp(self):
+        self.cache = LRUCache()
+        self.router = routing.Router(
+            mapper=routing.WerkzeugMapper(
+                map=werkzeug.routing.Map(host_matching=True),
+            ),
+            route_cache=self.cache,
+        )
+
+    def request(self, host, path, scheme=u"http"):
+        return Request(
+            url=URL(scheme=scheme, host=host, path=path, rooted=True),
+        )
+
+    def test_it_caches_per_host(self):
+        self.router.add(b"/", view, host=u"<tenant>.example.com")
+        responses = [
+            json.loads(
+                self.router.route(
+                    self.request(host=host, path=[u""]), path=b"/",
+                ).content,
+            )
+            for host in [u"foo.example.com", u"bar.example.com"]
+        ]
+        self.assertEqual(
+            responses, [{u"tenant": u"foo"}, {u"tenant": u"bar"}],
+        )
+
+    def test_it_does_not_cache_redirects(self):
+        self.router.add(b"/foo/", view, host=u"<tenant>.example.com")
+        self.router.route(
+            self.request(host=u"evil.example.com", path=[u"foo"]),
+            path=b"/foo",
+        )
+        response = self.router.route(
+            self.request(
+                scheme=u"https", host=u"good.example.com", path=[u"foo"],
+            ),
+            path=b"/foo",
+        )
+        self.assertEqual(
+            (response, len(self.cache)),
+            (redirect(b"https://good.example.com/foo/", code=301), 0),
+        )
+
+    def test_options_are_cached_per_host(self):
+        self.router.add(b"/", view, host=u"foo.example.com")
+        responses = [
+            self.router.route(
+                Request(
+                    url=URL(scheme=u"http", host=host, path=[u""]),
+                    method=b"OPTIONS",
+                ),
+                path=b"/",
+            ).code
+            for host in [u"foo.example.com", u"bar.example.com"]
+        ]
+        self.assertEqual(responses, [200, 404])
+
 
 class TestSimpleMapper(MapperTestMixin, TestCase):
     def setUp(self):
         self.mapper = routing.SimpleMapper()
+
+
+class TestTrieMapper(MapperTestMixin, TestCase):
+    def setUp(self):
+        self.mapper = routing.TrieMapper()
+
+    def map(self, path, method=b"GET"):
+        request = Request(url=URL(path=[u""]), method=method)
+        render = self.mapper.map(request, path=path)
+        if render is None:
+            return None
+        return json.loads(render(request).content)
+
+    def test_it_maps_routes_with_arguments(self):
+        self.mapper.add(b"/route/<year>/<int:month>", view)
+        self.assertEqual(
+            self.map(b"/route/2013/12"), {u"year": u"2013", u"month": 12},
+        )
+
+    def test_int_placeholders_reject_non_integers(self):
+        self.mapper.add(b"/route/<int:year>", view)
+        self.assertIsNone(self.map(b"/route/foo"))
+
+    def test_string_placeholders_reject_empty_segments(self):
+        self.mapper.add(b"/route/<name>", view)
+        self.assertIsNone(self.map(b"/route/"))
+
+    def test_path_placeholders(self):
+        self.mapper.add(b"/files/<path:name>", view)
+        self.assertEqual(self.map(b"/files/a/b/c"), {u"name": u"a/b/c"})
+
+    def test_path_placeholders_must_be_last(self):
+        with self.assertRaises(ValueError):
+            self.mapper.add(b"/files/<path:name>/foo", view)
+
+    def test_custom_converters(self):
+        mapper = routing.TrieMapper(converters={"upper": lambda s: s.upper()})
+        mapper.add(b"/<upper:name>", view)
+        request = Request(url=URL(path=[u""]))
+        render = mapper.map(request, path=b"/foo")
+        self.assertEqual(
+            json.loads(render(request).content), {u"name": u"FOO"},
+        )
+
+    def test_unknown_converters(self):
+        with self.assertRaises(ValueError):
+            self.mapper.add(b"/<nope:name>", view)
+
+    def test_partial_segment_placeholders_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.mapper.add(b"/file-<int:id>", view)
+
+    def test_static_segments_take_precedence(self):
+        self.mapper.add(b"/users/<name>", view)
+        self.mapper.add(b"/users/new", lambda request: Response(b"{}"))
+        self.assertEqual(
+            (self.map(b"/users/new"), self.map(b"/users/bob")),
+            ({}, {u"name": u"bob"}),
+        )
+
+    def test_it_backtracks_to_placeholders(self):
+        self.mapper.add(b"/users/new/edit", lambda request: Response(b"{}"))
+        self.mapper.add(b"/users/<name>/delete", view)
+        self.assertEqual(self.map(b"/users/new/delete"), {u"name": u"new"})
+
+    def test_it_backtracks_for_methods(self):
+        self.mapper.add(b"/users/new", view, methods=[b"GET"])
+        self.mapper.add(b"/users/<name>", view, methods=[b"POST"])
+        self.assertEqual(
+            self.map(b"/users/new", method=b"POST"), {u"name": u"new"},
+        )
+
+    def test_it_builds_routes_with_arguments(self):
+        self.mapper.add(b"/<int:year>/<name>", view, route_name=u"year")
+        url = self.mapper.lookup(u"year", year=2012, name=b"a b", page=2)
+        self.assertEqual(url, b"/2012/a%20b?page=2")
+
+    def test_it_builds_path_placeholders(self):
+        self.mapper.add(b"/files/<path:name>", view, route_name=u"file")
+        url = self.mapper.lookup(u"file", name=b"a/b")
+        self.assertEqual(url, b"/files/a/b")
+
+    def test_missing_build_arguments_become_literal_paths(self):
+        self.mapper.add(b"/<int:year>", view, route_name=u"year")
+        self.assertEqual(self.mapper.lookup(u"year"), u"year")
+
+    def test_static_routes_fall_back_to_placeholders_for_other_methods(self):
+        self.mapper.add(b"/users/new", view, methods=[b"GET"])
+        self.mapper.add(b"/users/<name>", view, methods=[b"POST"])
+        self.assertEqual(
+            (self.map(b"/users/new"), self.map(b"/users/new", b"POST")),
+            ({}, {u"name": u"new"}),
+        )
+
+    def test_freeze(self):
+        self.mapper.add(b"/<int:year>", view)
+        frozen = self.mapper.freeze()
+        self.assertEqual(self.map(b"/2012"), {u"year": 2012})
+        with self.assertRaises(routing.AlreadyFrozen):
+            frozen.add(b"/", view)
+
+    def test_statistics(self):
+        statistics = routing.RouteStatistics()
+        self.mapper = routing.TrieMapper(statistics=statistics)
+        self.mapper.add(b"/", view)
+        self.mapper.add(b"/<int:year>", view)
+        for path in [b"/", b"/2013", b"/2014", b"/nope"]:
+            self.map(path)
+        self.assertEqual(
+            (dict(statistics.hits), statistics.misses),
+            ({b"/": 1, b"/<int:year>": 2}, 1),
+        )
+
+
+class TestFrozenMapper(TestCase):
+    def setUp(self):
+        self.mapper = routing.SimpleMapper()
+
+    def test_it_maps_what_the_unfrozen_mapper_did(self):
+        self.mapper.add(b"/", view, methods=[b"POST"])
+        frozen = self.mapper.freeze()
+        get = Request(url=URL(path=[u""]), method=b"GET")
+        post = Request(url=URL(path=[u""]), method=b"POST")
+        self.assertEqual(
+            (frozen.map(get, path=b"/"), frozen.map(post, path=b"/")),
+            (None, view),
+        )
+
+    def test_it_is_not_affected_by_the_unfrozen_mapper(self):
+        frozen = self.mapper.freeze()
+        self.mapper.add(b"/", view)
+        request = Request(url=URL(path=[u""]))
+        self.assertIsNone(frozen.map(request, path=b"/"))
+
+    def test_lookup(self):
+        self.mapper.add(b"/hello", view, route_name=u"hello")
+        frozen = self.mapper.freeze()
+        self.mapper.add(b"/bye", view, route_name=u"bye")
+        self.assertEqual(
+            (frozen.lookup(u"hello"), frozen.lookup(u"bye")),
+            (b"/hello", u"bye"),
+        )
+
+    def test_freeze(self):
+        frozen = self.mapper.freeze()
+        self.assertIs(frozen.freeze(), frozen)
@@ -0,0 +1,231 @@
+from unittest import TestCase
+import gzip
+import os
+import shutil
+import tempfile
+
+from hyperlink import URL
+from werkzeug.http import http_date
+
+from minion.http import Headers
+from minion.request import FileResponse, Request
+from minion.routing import PrefixRouter, Router, SimpleMapper
+from minion.static import StaticFiles
+
+
+def request(method=b"GET", **headers):
+    return Request(
+        url=URL(path=[u""]),
+        method=method,
+        headers=Headers(
+            (name.replace("_", "-"), [value])
+            for name, value in headers.items()
+        ),
+    )
+
+
+class TestStaticFiles(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.static = StaticFiles(directory=self.directory, max_cached_size=8)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as file:
+            file.write(content)
+        return path
+
+    def test_small_files_are_cached(self):
+        path = self.write("hello.txt", b"hello")
+        response = self.static.route(request(), b"/hello.txt")
+        os.remove(path)
+        again = self.static.route(request(), b"/hello.txt")
+        self.assertEqual(
+            (
+                response.content,
+                again.content,
+                response.headers.get("Content-Type"),
+            ),
+            (b"hello", b"hello", [b"text/plain"]),
+        )
+
+    def test_large_files_are_not_buffered(self):
+        self.write("big.css", b"body {}\n" * 100)
+        response = self.static.route(request(), b"/big.css")
+        self.addCleanup(response.content.close)
+        self.assertEqual(
+            (
+                type(response),
+                response.content_length,
+                response.headers.get("Content-Type"),
+            ),
+            (FileResponse, 800, [b"text/css"]),
+        )
+
+    def test_etag(self):
+        self.write("hello.txt", b"hello")
+        etag = self.static.route(request(), b"/hello.txt").headers.get("ETag")
+        response = self.static.route(
+            request(If_None_Match=etag[0]), b"/hello.txt",
+        )
+        self.assertEqual((response.code, response.content), (304, b""))
+
+    def test_stale_etag(self):
+        self.write("hello.txt", b"hello")
+        response = self.static.route(
+            request(If_None_Match=b'"nope"'), b"/hello.txt",
+        )
+        self.assertEqual((response.code, response.content), (200, b"hello"))
+
+    def test_if_modified_since(self):
+        path = self.write("hello.txt", b"hello")
+        os.utime(path, (1000000000, 1000000000))
+        since = http_date(1000000000 + 60)
+        if not isinstance(since, bytes):
+            since = since.encode("ascii")
+        response = self.static.route(
+            request(If_Modified_Since=since), b"/hello.txt",
+        )
+        self.assertEqual(response.code, 304)
+
+    def test_modified_since(self):
+        path = self.write("hello.txt", b"hello")
+        os.utime(path, (1000000000, 1000000000))
+        since = http_date(1000000000 - 60)
+        if not isinstance(since, bytes):
+            since = since.encode("ascii")
+        response = self.static.route(
+            request(If_Modified_Since=since), b"/hello.txt",
+        )
+        self.assertEqual(response.code, 200)
+
+    def test_gzipped_sibling(self):
+        self.write("hello.txt", b"hello")
+        self.write("hello.txt.gz", gzip.zlib.compress(b"hello"))
+        response = self.static.route(
+            request(Accept_Encoding=b"gzip"), b"/hello.txt",
+        )
+        self.assertEqual(
+            (
+                response.headers.get("Content-Encoding"),
+                response.headers.get("Content-Type"),
+                response.headers.get("Vary"),
+            ),
+            ([b"gzip"], [b"text/plain"], [b"Accept-Encoding"]),
+        )
+
+    def test_gzipped_sibling_not_accepted(self):
+        self.write("hello.txt", b"hello")
+        self.write("hello.txt.gz", gzip.zlib.compress(b"hello"))
+        response = self.static.route(
+            request(Accept_Encoding=b"gzip;q=0, deflate"), b"/hello.txt",
+        )
+        self.assertEqual(
+            (
+                response.content,
+                response.headers.get("Content-Encoding"),
+                response.headers.get("Vary"),
+            ),
+            (b"hello", None, [b"Accept-Encoding"]),
+        )
+
+    def test_gzipped_sibling_has_its_own_etag(self):
+        self.write("hello.txt", b"hello")
+        self.write("hello.txt.gz", gzip.zlib.compress(b"hello"))
+        plain = self.static.route(request(), b"/hello.txt")
+        gzipped = self.static.route(
+            request(Accept_Encoding=b"gzip"), b"/hello.txt",
+        )
+        self.assertNotEqual(
+            plain.headers.get("ETag"), gzipped.headers.get("ETag"),
+        )
+
+    def test_traversal(self):
+        os.mkdir(os.path.join(self.directory, "sub"))
+        self.write("sub/inner.txt", b"inner")
+        responses = [
+            self.static.route(request(), path).code
+            for path in [
+                b"/../etc/passwd",
+                b"/sub/../sub/inner.txt",
+                b"/./sub/inner.txt",
+                b"/sub\\..\\inner.txt",
+                b"/sub/inner.txt\0",
+            ]
+        ]
+        self.assertEqual(responses, [404] * 5)
+
+    def test_symlinks_outside_the_directory(self):
+        outside = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, outside)
+        with open(os.path.join(outside, "secret"), "wb") as file:
+            file.write(b"secret")
+        os.symlink(
+            os.path.join(outside, "secret"),
+            os.path.join(self.directory, "secret"),
+        )
+        response = self.static.route(request(), b"/secret")
+        self.assertEqual(response.code, 404)
+
+    def test_symlinked_directory(self):
+        real = os.path.join(self.directory, "real")
+        os.mkdir(real)
+        with open(os.path.join(real, "hello.txt"), "wb") as file:
+            file.write(b"hello")
+        link = os.path.join(self.directory, "link")
+        os.symlink(real, link)
+        static = StaticFiles(directory=link)
+        response = static.route(request(), b"/hello.txt")
+        self.assertEqual((response.code, response.content), (200, b"hello"))
+
+    def test_directories(self):
+        os.mkdir(os.path.join(self.directory, "sub"))
+        response = self.static.route(request(), b"/sub")
+        self.assertEqual(response.code, 404)
+
+    def test_missing(self):
+        response = self.static.route(request(), b"/missing")
+        self.assertEqual(response.code, 404)
+
+    def test_head(self):
+        self.write("hello.txt", b"hello")
+        response = self.static.route(request(method=b"HEAD"), b"/hello.txt")
+        self.assertEqual(
+            (response.content, response.headers.get("Content-Length")),
+            (b"", [b"5"]),
+        )
+
+    def test_other_methods(self):
+        self.write("hello.txt", b"hello")
+        response = self.static.route(request(method=b"POST"), b"/hello.txt")
+        self.assertEqual(
+            (response.code, response.headers.get("Allow")),
+            (405, [b"GET, HEAD"]),
+        )
+
+    def test_max_age(self):
+        self.write("hello.txt", b"hello")
+        static = StaticFiles(directory=self.directory, max_age=60)
+        response = static.route(request(), b"/hello.txt")
+        self.assertEqual(
+            response.headers.get("Cache-Control"), [b"public, max-age=60"],
+        )
+
+    def test_clear(self):
+        self.write("hello.txt", b"hello")
+        self.static.route(request(), b"/hello.txt")
+        self.write("hello.txt", b"bye")
+        self.static.clear()
+        response = self.static.route(request(), b"/hello.txt")
+        self.assertEqual(response.content, b"bye")
+
+    def test_mounted(self):
+        self.write("hello.txt", b"hello")
+        router = PrefixRouter(default=Router(mapper=SimpleMapper()))
+        router.mount(b"static", self.static)
+        response = router.route(request(), b"/static/hello.txt")
+        self.assertEqual(
+            (response.content, router.lookup("static:hello.txt")),
+            (b"hello", b"/static/hello.txt"),
+        )
@@ -135,3 +135,125 @@ class TestTraverse(TestCase):
             path=b"/0/1/2/3/4/5", resource=root, request=request,
         )
         self.assertEqual(renderer.render(request), b"2")
+
+
+class CountingResource(object):
+    """
+    A resource which counts the number of times it has been traversed.
+
+    """
+
+    def __init__(self, child):
+        self.child = child
+        self.traversed = 0
+
+    def get_child(self, name, request):
+        self.traversed += 1
+        return self.child
+
+
+class TestTraversalCache(TestCase):
+    def setUp(self):
+        self.cache = traversal.TraversalCache()
+        self.request = Request(url=URL(path=[u""]))
+
+    def traverse(self, path, root):
+        return self.cache.traverse(
+            path=path, request=self.request, resource=root,
+        )
+
+    def test_it_traverses_resources(self):
+        root = LineDelimiterResource()
+        resource = self.traverse(b"/foo/bar", root)
+        self.assertEqual(resource.render(self.request), b"foo\nbar")
+
+    def test_it_reuses_traversals(self):
+        leaf = traversal.LeafResource(render=path_view)
+        root = CountingResource(child=leaf)
+        resources = [self.traverse(b"/foo", root) for _ in range(3)]
+        self.assertEqual((resources, root.traversed), ([leaf] * 3, 1))
+
+    def test_leaf_resources_are_not_traversed(self):
+        leaf = traversal.LeafResource(render=path_view)
+        root = CountingResource(child=leaf)
+        self.assertIs(self.traverse(b"/foo/bar/baz", root), leaf)
+
+    def test_it_is_keyed_on_the_root(self):
+        one = traversal.LeafResource(render=path_view)
+        two = traversal.LeafResource(render=path_view)
+        first = CountingResource(child=one)
+        second = CountingResource(child=two)
+        self.assertEqual(
+            (self.traverse(b"/foo", first), self.traverse(b"/foo", second)),
+            (one, two),
+        )
+
+    def test_dynamic_resources_are_not_cached(self):
+        leaf = traversal.LeafResource(render=path_view)
+        root = CountingResource(child=leaf)
+        root.is_dynamic = True
+        for _ in range(3):
+            self.traverse(b"/foo", root)
+        self.assertEqual(root.traversed, 3)
+
+    def test_traversals_ending_at_dynamic_resources_are_not_cached(self):
+        leaf = traversal.LeafResource(render=path_view)
+        leaf.is_dynamic = True
+        root = CountingResource(child=leaf)
+        for _ in range(3):
+            self.traverse(b"/foo", root)
+        self.assertEqual(root.traversed, 3)
+
+    def test_setting_a_child_invalidates_its_subtree(self):
+        root = traversal.TreeResource()
+        child = traversal.TreeResource()
+        root.set_child(b"foo", child)
+        grandchild = traversal.LeafResource(render=path_view)
+        child.set_child(b"bar", grandchild)
+        other = traversal.LeafResource(render=path_view)
+        root.set_child(b"baz", other)
+
+        self.traverse(b"/foo/bar", root)
+        self.traverse(b"/baz", root)
+
+        new = traversal.LeafResource(render=lambda request: Response(b"new"))
+        root.set_child(b"foo", new)
+        self.assertEqual(
+            (self.traverse(b"/foo/bar", root), self.traverse(b"/baz", root)),
+            (new, other),
+        )
+
+    def test_setting_a_deeper_child_invalidates_its_subtree(self):
+        root = traversal.TreeResource()
+        child = traversal.TreeResource()
+        root.set_child(b"foo", child)
+        self.assertEqual(
+            self.traverse(b"/foo/bar", root).render(self.request).code, 404,
+        )
+
+        new = traversal.LeafResource(render=path_view)
+        child.set_child(b"bar", new)
+        self.assertIs(self.traverse(b"/foo/bar", root), new)
+
+    def test_children_replaced_while_traversing(self):
+        root = traversal.TreeResource()
+        leaf = traversal.LeafResource(render=path_view)
+        new = traversal.LeafResource(render=lambda request: Response(b"new"))
+
+        class Racing(object):
+            def get_child(self, name, request):
+                root.set_child(b"foo", new)
+                return leaf
+
+        root.set_child(b"foo", Racing())
+        first = self.traverse(b"/foo/bar", root)
+        second = self.traverse(b"/foo/bar", root)
+        self.assertEqual((first, second), (leaf, new))
+
+    def test_it_is_bounded(self):
+        cache = traversal.TraversalCache(maxsize=1)
+        leaf = traversal.LeafResource(render=path_view)
+        root = CountingResource(child=leaf)
+        for path in [b"/foo", b"/bar", b"/foo"]:
+            cache.traverse(path=path, request=self.request, resource=root)
+        self.assertEqual(root.traversed, 3)
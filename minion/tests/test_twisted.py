@@ -2,6 +2,7 @@ from mock import patch
 from unittest import skipIf
 import io
 import sys
+import tempfile
 
 from future.moves.urllib.parse import parse_qs
 from future.utils import PY3
@@ -11,7 +12,7 @@ from zope.interface.verify import verifyObject
 
 from minion.core import Application
 from minion.http import Headers
-from minion.request import Response
+from minion.request import FileResponse, Response
 from minion.tests.test_integration import RequestIntegrationTestMixin
 from minion.twisted import MinionResource
 
@@ -85,6 +86,114 @@ class TestMinionResource(SynchronousTestCase):
         render(resource=self.resource, request=request)
         self.assertEqual(request.getWrittenData(), b"Hello world")
 
+    @skipIf(PY3, "twisted.web doesn't support Py3 yet")
+    def test_it_streams_iterable_content(self):
+        @self.minion.route(b"/")
+        def respond(request):
+            return Response(chunk for chunk in [b"Hello ", b"big ", b"world"])
+
+        request = makeRequest(path=b"/")
+        render(resource=self.resource, request=request)
+        while request.producer is not None:
+            request.producer.resumeProducing()
+        self.assertEqual(
+            (request.getWrittenData(), request.writeCount, request.finished),
+            (b"Hello big world", 3, True),
+        )
+
+    @skipIf(PY3, "twisted.web doesn't support Py3 yet")
+    def test_it_stops_streaming_when_the_connection_is_lost(self):
+        closed = []
+
+        def chunks():
+            try:
+                yield b"Hello"
+                yield b"world"
+            finally:
+                closed.append(True)
+
+        @self.minion.route(b"/")
+        def respond(request):
+            return Response(chunks())
+
+        request = makeRequest(path=b"/")
+        render(resource=self.resource, request=request, notifyFinish=False)
+        request.producer.stopProducing()
+        self.assertEqual(closed, [True])
+
+    @skipIf(PY3, "twisted.web doesn't support Py3 yet")
+    def test_it_sends_files(self):
+        file = tempfile.TemporaryFile()
+        file.write(b"Hello world")
+        file.seek(0)
+
+        @self.minion.route(b"/")
+        def respond(request):
+            return FileResponse(file)
+
+        request = makeRequest(path=b"/")
+        render(resource=self.resource, request=request)
+        self.assertEqual(
+            (
+                request.getWrittenData(),
+                request.responseHeaders.getRawHeaders(b"Content-Length"),
+                request.finished,
+                file.closed,
+            ),
+            (b"Hello world", [b"11"], True, True),
+        )
+
+    @skipIf(PY3, "twisted.web doesn't support Py3 yet")
+    def test_it_sets_cookies(self):
+        @self.minion.route(b"/")
+        def respond(request):
+            response = Response(b"")
+            response.set_cookie(b"foo", b"bar")
+            response.set_cookie(b"baz", b"quux", secure=True)
+            return response
+
+        request = makeRequest(path=b"/")
+        render(resource=self.resource, request=request)
+        self.assertEqual(
+            request.responseHeaders.getRawHeaders(b"Set-Cookie"),
+            [b"foo=bar", b"baz=quux; Secure"],
+        )
+
+    @skipIf(PY3, "twisted.web doesn't support Py3 yet")
+    def test_it_keeps_set_cookie_headers_alongside_cookies(self):
+        @self.minion.route(b"/")
+        def respond(request):
+            response = Response(
+                b"", headers=Headers([(b"Set-Cookie", [b"a=1"])]),
+            )
+            response.set_cookie(b"b", b"2")
+            return response
+
+        request = makeRequest(path=b"/")
+        render(resource=self.resource, request=request)
+        self.assertEqual(
+            request.responseHeaders.getRawHeaders(b"Set-Cookie"),
+            [b"a=1", b"b=2"],
+        )
+
+    @skipIf(PY3, "twisted.web doesn't support Py3 yet")
+    def test_it_runs_after_sent_callbacks_once_finished(self):
+        sent = []
+
+        @self.minion.route(b"/")
+        def respond(request):
+            self.minion.manager.after_sent(request, sent.append)
+            return Response(chunk for chunk in [b"Hello ", b"world"])
+
+        request = makeRequest(path=b"/")
+        render(resource=self.resource, request=request, notifyFinish=False)
+        self.assertEqual(sent, [])
+        while request.producer is not None:
+            request.producer.resumeProducing()
+        self.assertEqual(
+            [response.code for response in sent], [200],
+        )
+
     def test_interface(self):
         verifyObject(IResource, self.resource)
 
@@ -1,4 +1,6 @@
 from unittest import TestCase, skipIf
+import io
+import tempfile
 
 from future.utils import PY3
 from hyperlink import URL
@@ -8,7 +10,7 @@ from werkzeug.test import create_environ
 from minion import wsgi
 from minion.core import Application
 from minion.http import Headers
-from minion.request import Response
+from minion.request import FileResponse, Response
 from minion.tests.test_integration import RequestIntegrationTestMixin
 from minion.tests.test_request import RequestTestMixin
 
@@ -63,12 +65,168 @@ class TestWSGIMinion(TestCase):
             b"application/json",
         )
 
+    def test_it_streams_iterable_content(self):
+        closed = []
+
+        class Chunks(object):
+            def __iter__(self):
+                return iter([b"Hello ", b"world!"])
+
+            def close(self):
+                closed.append(True)
+
+        @self.minion.route(b"/respond")
+        def respond(request):
+            return Response(Chunks())
+
+        response = self.wsgi.get(b"/respond", status=200)
+        self.assertEqual((response.body, closed), (b"Hello world!", [True]))
+
+    def test_it_sends_files(self):
+        file = tempfile.TemporaryFile()
+        file.write(b"Hello world")
+        file.seek(0)
+
+        @self.minion.route(b"/respond")
+        def respond(request):
+            return FileResponse(
+                file, headers=Headers([(b"Content-Type", [b"text/plain"])]),
+            )
+
+        response = self.wsgi.get(b"/respond", status=200)
+        self.assertEqual(
+            (response.body, response.headers[b"Content-Length"], file.closed),
+            (b"Hello world", b"11", True),
+        )
+
+    def test_it_runs_after_sent_callbacks_on_close(self):
+        sent = []
+
+        @self.minion.route(b"/respond")
+        def respond(request):
+            self.minion.manager.after_sent(request, sent.append)
+            return Response(
+                b"Hello",
+                headers=Headers([(b"Content-Type", [b"text/plain"])]),
+            )
+
+        app = wsgi.create_app(self.minion)
+        body = app(create_environ("/respond"), lambda status, headers: None)
+        self.assertEqual((b"".join(body), sent), (b"Hello", []))
+        body.close()
+        self.assertEqual([response.content for response in sent], [b"Hello"])
+
+    def test_it_does_not_wrap_bodies_needlessly(self):
+        @self.minion.route(b"/respond")
+        def respond(request):
+            return Response(b"Hello")
+
+        app = wsgi.create_app(self.minion)
+        body = app(create_environ("/respond"), lambda status, headers: None)
+        self.assertEqual(body, [b"Hello"])
+
+    def test_it_uses_the_servers_file_wrapper(self):
+        wrapped = []
+
+        def file_wrapper(file, block_size):
+            wrapped.append(file)
+            return iter([file.read()])
+
+        file = tempfile.TemporaryFile()
+        self.addCleanup(file.close)
+        file.write(b"Hello world")
+        file.seek(0)
+
+        @self.minion.route(b"/respond")
+        def respond(request):
+            return FileResponse(
+                file, headers=Headers([(b"Content-Type", [b"text/plain"])]),
+            )
+
+        response = self.wsgi.get(
+            b"/respond", extra_environ={"wsgi.file_wrapper": file_wrapper},
+        )
+        self.assertEqual((response.body, wrapped), (b"Hello world", [file]))
+
+    def test_it_runs_after_sent_callbacks_when_wrapped_files_close(self):
+        sent, wrapped = [], []
+
+        class FileWrapper(object):
+            def __init__(self, file, block_size):
+                wrapped.append(self)
+                self.file = file
+
+            def __iter__(self):
+                return iter([self.file.read()])
+
+            def close(self):
+                self.file.close()
+
+        file = tempfile.TemporaryFile()
+        file.write(b"Hello world")
+        file.seek(0)
+
+        @self.minion.route(b"/respond")
+        def respond(request):
+            self.minion.manager.after_sent(request, sent.append)
+            return FileResponse(
+                file, headers=Headers([(b"Content-Type", [b"text/plain"])]),
+            )
+
+        app = wsgi.create_app(self.minion)
+        environ = create_environ("/respond")
+        environ["wsgi.file_wrapper"] = FileWrapper
+        body = app(environ, lambda status, headers: None)
+        self.assertEqual(
+            (
+                body is wrapped[0],
+                b"".join(body),
+                body.file.fileno(),
+                sent,
+            ),
+            (True, b"Hello world", file.fileno(), []),
+        )
+        body.close()
+        self.assertEqual((file.closed, len(sent)), (True, 1))
+
+    def test_it_sets_cookies(self):
+        @self.minion.route(b"/respond")
+        def respond(request):
+            response = Response(b"")
+            response.set_cookie(b"foo", b"bar")
+            response.set_cookie(b"baz", b"quux", secure=True)
+            return response
+
+        response = self.wsgi.get(b"/respond", status=200)
+        self.assertEqual(
+            response.headers.getall(b"Set-Cookie"),
+            [b"foo=bar", b"baz=quux; Secure"],
+        )
+
 
 class TestRequest(RequestTestMixin, TestCase):
     def make_request(self, headers):
         headers = {k: b",".join(v) for k, v in headers.canonicalized()}
         return wsgi.Request(environ=create_environ(headers=headers))
 
+    def make_request_with_body(self, content_type, body):
+        return wsgi.Request(
+            environ=create_environ(
+                input_stream=io.BytesIO(body),
+                content_type=str(content_type.decode("ascii")),
+                content_length=len(body),
+            ),
+        )
+
+    def test_form_with_a_malformed_content_length(self):
+        environ = create_environ(
+            input_stream=io.BytesIO(b"foo=bar"),
+            content_type="application/x-www-form-urlencoded",
+        )
+        environ["CONTENT_LENGTH"] = "nope"
+        request = wsgi.Request(environ=environ)
+        self.assertEqual(list(request.form), [])
+
     def test_query_string(self):
         environ = {
             "SERVER_NAME": "example.com",
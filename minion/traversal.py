@@ -3,6 +3,10 @@ Helpers for applications that use object traversal routing.
 
 """
 
+from collections import OrderedDict
+from threading import Lock
+from weakref import WeakSet
+
 from future.utils import PY3, iteritems
 import attr
 
@@ -29,6 +33,9 @@ class TreeResource(object):
 
     render = attr.ib(default=lambda request: Response(code=404))
     _children = attr.ib(default=attr.Factory(dict))
+    _caches = attr.ib(
+        default=attr.Factory(WeakSet), init=False, repr=False, cmp=False,
+    )
 
     _no_such_child = LeafResource(render=lambda request: Response(code=404))
 
@@ -40,6 +47,8 @@ class TreeResource(object):
 
     def set_child(self, name, resource):
         self._children[name] = resource
+        for cache in list(self._caches):
+            cache.invalidate(parent=self, name=name)
 
 
 def method_delegate(**methods):
@@ -73,3 +82,102 @@ def traverse(path, request, resource):
             break
         resource = resource.get_child(name=component, request=request)
     return resource
+
+
+class TraversalCache(object):
+    """
+    A cache of the resources found by traversing paths from a root resource.
+
+    Traversals which pass through a resource with a true ``is_dynamic``
+    attribute, or end at one, are never cached.
+
+    Tree resources invalidate any cached traversal beneath a child they
+    replace. Other resources whose children may change should either be
+    dynamic, or call :meth:`invalidate` themselves when they do.
+
+    Arguments:
+
+        maxsize (int):
+
+            the maximum number of traversals to keep
+
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._paths_through = {}
+        self._generation = 0
+        self._lock = Lock()
+
+    def traverse(self, path, request, resource):
+        """
+        Traverse a root resource as :func:`traverse` would, or reuse a
+        previous traversal of the same path from the same root.
+
+        """
+
+        # Cached entries keep the root alive, so its id is never reused.
+        key = id(resource), path
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+                return entry[0]
+            # Children replaced while traversing invalidate nothing cached
+            # yet, so the result is only stored if nothing was invalidated.
+            generation = self._generation
+
+        edges = []
+        cacheable = not getattr(resource, "is_dynamic", False)
+        components = path.lstrip(b"/")
+        for component in components and components.split(b"/"):
+            if getattr(resource, "is_leaf", False):
+                break
+            edges.append((resource, component))
+            caches = getattr(resource, "_caches", None)
+            if caches is not None:
+                caches.add(self)
+            resource = resource.get_child(name=component, request=request)
+            if getattr(resource, "is_dynamic", False):
+                cacheable = False
+
+        if cacheable:
+            self._store(
+                key=key, resource=resource, edges=edges, generation=generation,
+            )
+        return resource
+
+    def invalidate(self, parent, name):
+        """
+        Forget any traversals which passed through the given child.
+
+        """
+
+        with self._lock:
+            self._generation += 1
+            for key in self._paths_through.pop((id(parent), name), ()):
+                self._forget(key)
+
+    def _store(self, key, resource, edges, generation):
+        with self._lock:
+            if key in self._entries or generation != self._generation:
+                return
+            self._entries[key] = resource, edges
+            for parent, name in edges:
+                edge = id(parent), name
+                self._paths_through.setdefault(edge, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._forget(next(iter(self._entries)))
+
+    def _forget(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for parent, name in entry[1]:
+            edge = id(parent), name
+            keys = self._paths_through.get(edge)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._paths_through[edge]
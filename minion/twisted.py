@@ -1,11 +1,17 @@
 from __future__ import absolute_import
 
+from future.utils import text_type
 from hyperlink import URL
+from twisted.internet.interfaces import IPullProducer
+from twisted.protocols.basic import FileSender
 from twisted.web.resource import IResource
+from twisted.web.server import NOT_DONE_YET
 from zope.interface import implementer
 
 from minion.http import Headers
-from minion.request import Request
+from minion.request import (
+    FileResponse, Request, _awaiting_sent, response_sent,
+)
 
 
 @implementer(IResource)
@@ -51,10 +57,91 @@ class MinionResource(object):
         response = self.application.serve(
             request=request, path=b"/" + b"/".join(twistedRequest.postpath),
         )
+        if _awaiting_sent(request):
+            # Whether the response was finished or the connection was lost.
+            twistedRequest.notifyFinish().addBoth(
+                lambda _: response_sent(request=request, response=response),
+            )
 
         twistedRequest.setResponseCode(response.code)
 
         for k, v in response.headers.canonicalized():
             twistedRequest.responseHeaders.setRawHeaders(k, v)
+        for cookie in response.cookies:
+            # Added to, rather than replacing, any Set-Cookie headers.
+            twistedRequest.responseHeaders.addRawHeader(
+                b"Set-Cookie", cookie.serialize(),
+            )
 
-        return response.content
+        content = response.content
+        if isinstance(response, FileResponse):
+            length = response.content_length
+            if length is not None and "Content-Length" not in response.headers:
+                twistedRequest.setHeader(
+                    b"Content-Length", str(length).encode("ascii"),
+                )
+            _send_file(request=twistedRequest, file=content)
+            return NOT_DONE_YET
+        if isinstance(content, (bytes, text_type)):
+            return content
+
+        producer = _ChunkProducer(request=twistedRequest, chunks=content)
+        twistedRequest.notifyFinish().addErrback(
+            lambda _: producer.stopProducing(),
+        )
+        twistedRequest.registerProducer(producer, False)
+        return NOT_DONE_YET
+
+
+def _send_file(request, file):
+    """
+    Stream a file to the given request, closing it afterwards.
+
+    """
+
+    def close(result):
+        file.close()
+        return result
+
+    sent = FileSender().beginFileTransfer(file, request)
+    sent.addCallback(lambda _: request.finish())
+    sent.addBoth(close)
+    # Failing here means the connection was lost, so there's no one to tell.
+    sent.addErrback(lambda _: None)
+
+
+@implementer(IPullProducer)
+class _ChunkProducer(object):
+    """
+    Write an iterable response body one chunk at a time, as it's wanted.
+
+    """
+
+    def __init__(self, request, chunks):
+        self._request = request
+        self._iterable = chunks
+        self._chunks = iter(chunks)
+        self._stopped = False
+
+    def resumeProducing(self):
+        if self._stopped:
+            return
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._close()
+            self._request.unregisterProducer()
+            self._request.finish()
+        else:
+            self._request.write(chunk)
+
+    def stopProducing(self):
+        self._close()
+
+    def _close(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        close = getattr(self._iterable, "close", None)
+        if close is not None:
+            close()
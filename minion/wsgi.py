@@ -1,19 +1,29 @@
+from functools import partial
+
 from cached_property import cached_property as calculated_once
 from future.moves.urllib.parse import parse_qsl
-from future.utils import iteritems
+from future.utils import iteritems, text_type
 from hyperlink import URL
 
-from minion.http import Accept, Headers
+from minion.forms import FormParser, _parse_content_length
+from minion.http import Accept, Cookies, Headers
+from minion.request import FileResponse, _awaiting_sent, response_sent
 
 
 class Request(object):
-    def __init__(self, environ):
+    def __init__(self, environ, form_parser=FormParser()):
         self.environ = environ
+        self.form_parser = form_parser
 
     @calculated_once
     def accept(self):
         return Accept.from_header(header=self.environ.get("HTTP_ACCEPT"))
 
+    @calculated_once
+    def cookies(self):
+        header = self.environ.get("HTTP_COOKIE")
+        return Cookies(header=None if header is None else [header])
+
     @calculated_once
     def headers(self):
         return Headers(
@@ -26,6 +36,27 @@ class Request(object):
     def content(self):
         return self.environ["wsgi.input"]
 
+    @property
+    def form(self):
+        form, _ = self._parsed_form
+        return form
+
+    @property
+    def files(self):
+        _, files = self._parsed_form
+        return files
+
+    @calculated_once
+    def _parsed_form(self):
+        # Without a length there's no body, and reading one could block.
+        return self.form_parser.parse(
+            content=self.content,
+            content_type=self.environ.get("CONTENT_TYPE"),
+            content_length=_parse_content_length(
+                self.environ.get("CONTENT_LENGTH") or 0,
+            ),
+        )
+
     @calculated_once
     def method(self):
         return self.environ["REQUEST_METHOD"]
@@ -56,6 +87,56 @@ class Request(object):
         )
 
 
+_FILE_BLOCK_SIZE = 64 * 1024
+
+
+class _FileWrapper(object):
+    """
+    Iterate over a file in blocks, for servers without a ``wsgi.file_wrapper``.
+
+    """
+
+    def __init__(self, file, block_size):
+        self.file = file
+        self.block_size = block_size
+
+    def __iter__(self):
+        return iter(partial(self.file.read, self.block_size), b"")
+
+    def close(self):
+        self.file.close()
+
+
+class _Sending(object):
+    """
+    Report when a response body has been sent (i.e. when the server closes
+    it), for requests which have callbacks waiting on that.
+
+    Anything else is passed through to the wrapped body, so that files can be
+    wrapped before being handed to a server's ``wsgi.file_wrapper``\ , which
+    may then still make use of their ``fileno``\ .
+
+    """
+
+    def __init__(self, iterable, sent):
+        self._iterable = iterable
+        self._sent = sent
+
+    def __getattr__(self, name):
+        return getattr(self._iterable, name)
+
+    def __iter__(self):
+        return iter(self._iterable)
+
+    def close(self):
+        try:
+            close = getattr(self._iterable, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._sent()
+
+
 def create_app(application, request_class=Request):
     """
     Create a WSGI application out of the given Minion app.
@@ -76,15 +157,40 @@ def create_app(application, request_class=Request):
     """
 
     def wsgi(environ, start_response):
+        request = request_class(environ)
         response = application.serve(
-            request=request_class(environ),
-            path=environ.get("PATH_INFO", ""),
+            request=request, path=environ.get("PATH_INFO", ""),
         )
-        start_response(
-            response.status, [
-                (name, b",".join(values))
-                for name, values in response.headers.canonicalized()
-            ],
-        )
-        return [response.content]
+        sent = None
+        if _awaiting_sent(request):
+            sent = partial(response_sent, request=request, response=response)
+        return _body(environ, start_response, response, sent=sent)
     return wsgi
+
+
+def _body(environ, start_response, response, sent=None):
+    """
+    Start the given response, returning its body as a WSGI iterable.
+
+    If provided, ``sent`` is called once the server closes the body.
+
+    """
+
+    headers = response.serialized_headers()
+    content = response.content
+    if isinstance(response, FileResponse):
+        length = response.content_length
+        if length is not None and "Content-Length" not in response.headers:
+            headers.append(("Content-Length", str(length)))
+        start_response(response.status, headers)
+        if sent is not None:
+            content = _Sending(content, sent=sent)
+        file_wrapper = environ.get("wsgi.file_wrapper", _FileWrapper)
+        return file_wrapper(content, _FILE_BLOCK_SIZE)
+
+    start_response(response.status, headers)
+    if isinstance(content, (bytes, text_type)):
+        content = [content]
+    if sent is not None:
+        content = _Sending(content, sent=sent)
+    return content